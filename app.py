@@ -22,6 +22,15 @@ from org_helpers import (
     delete_membership,
 )
 
+# Copy-on-write: derived frames share memory until they are written to, so helpers
+# don't need defensive .copy() calls. pandas 3 always behaves this way and warns that
+# the option is deprecated, so it is only set on older versions.
+if int(pd.__version__.split(".")[0]) < 3:
+    try:
+        pd.set_option("mode.copy_on_write", True)
+    except KeyError:
+        pass
+
 # --- 1. CLOUD CONNECTION ---
 conn = st.connection("supabase", type=SupabaseConnection)
 
@@ -127,6 +136,20 @@ def get_current_user_id():
 
 # Module-level constant for the 31 possible day columns in inventory tables.
 _DAY_COLUMNS = [str(d) for d in range(1, 32)]
+# Stock totals that recalculation reads/writes alongside the day columns.
+_STOCK_COLUMNS = ["Opening Stock", "Total Received", "Consumption", "Closing Stock"]
+
+
+def _ensure_cols(df, defaults: dict):
+    """
+    Add every column of `defaults` ({column: fill value}) missing from df in a single
+    concat, instead of one `df[c] = v` per column (which fragments the frame's blocks).
+    """
+    missing = {c: v for c, v in defaults.items() if c not in df.columns}
+    if not missing:
+        return df
+    add = pd.DataFrame({c: [v] * len(df) for c, v in missing.items()}, index=df.index)
+    return pd.concat([df, add], axis=1)
 
 
 def clean_dataframe(df):
@@ -359,19 +382,48 @@ def _current_org_id():
 def _current_location_id():
     return st.session_state.get("location_id")
 
-@st.cache_data(ttl=60)
-def load_from_sheet(table_name, default_cols=None, allow_global_meta=False):
+@st.cache_resource
+def _table_generations() -> dict:
+    """Process-wide write counter per table; part of the _load_table cache key."""
+    return {}
+
+def _invalidate_table(table_name):
+    """Make cached loads of one table miss (for every session) without dropping the others."""
+    gens = _table_generations()
+    gens[table_name] = gens.get(table_name, 0) + 1
+
+def load_from_sheet(table_name, default_cols=None, allow_global_meta=False, columns=None):
     """
     Org-aware loader.
     - If st.session_state['org_id'] is set, applies .eq('org_id', ...)
     - For product_metadata: if allow_global_meta=True, returns rows where org_id IS NULL OR equals current org
     - For location-scoped tables (like persistent_inventory, activity_logs), filter by location_id if set.
+    Results are cached per (table, org, location, write generation); save_to_sheet and
+    append_to_sheet bump only their table via _invalidate_table.
+    - columns: optional list of column names to select server-side when the caller
+      only needs a few fields (e.g. the Supplier or Category pick lists). Projected
+      frames are read-only: anything that is edited and saved must load all columns,
+      and save_to_sheet refuses frames marked as projected.
     """
-    org_id = _current_org_id()
-    loc_id = _current_location_id()
+    df = _load_table(
+        table_name, default_cols, allow_global_meta, _current_org_id(), _current_location_id(),
+        _table_generations().get(table_name, 0), tuple(columns) if columns else None,
+    )
+    if columns:
+        df.attrs["projected"] = True
+    return df
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_table(table_name, default_cols, allow_global_meta, org_id, loc_id, generation=0, columns=None):
+    # org_id/loc_id are arguments (not read from session_state) so they are part of the
+    # cache key: st.cache_data is shared across sessions and must not mix tenants.
     try:
-        q = conn.table(table_name).select("*")
+        if columns:
+            # Quote names like "Product Name"; the global-meta path filters on org_id client-side
+            _cols = list(columns) + (["org_id"] if allow_global_meta and "org_id" not in columns else [])
+            q = conn.table(table_name).select(",".join(f'"{c}"' for c in _cols))
+        else:
+            q = conn.table(table_name).select("*")
 
         # Special handling for product_metadata: include global rows if requested
         if table_name == "product_metadata" and allow_global_meta:
@@ -389,9 +441,7 @@ def load_from_sheet(table_name, default_cols=None, allow_global_meta=False):
                 df = df[df["org_id"].isnull()]
             # ensure default cols
             if default_cols:
-                for c in default_cols:
-                    if c not in df.columns:
-                        df[c] = None
+                df = _ensure_cols(df, dict.fromkeys(default_cols))
             return df
 
         # Normal tables: apply filters server-side
@@ -412,9 +462,7 @@ def load_from_sheet(table_name, default_cols=None, allow_global_meta=False):
             return pd.DataFrame()
         df = clean_dataframe(df)
         if default_cols:
-            for col in default_cols:
-                if col not in df.columns:
-                    df[col] = None
+            df = _ensure_cols(df, dict.fromkeys(default_cols))
         return df
 
     except Exception as e:
@@ -454,6 +502,11 @@ def save_to_sheet(df: pd.DataFrame, table_name: str, pk: str = None):
         return False
     if isinstance(df, pd.DataFrame) and df.empty:
         return False
+    if df.attrs.get("projected"):
+        # A column-projected load lacks the conflict-target columns; upserting it
+        # would write partial rows instead of updating the existing ones.
+        st.error(f"Database Save Error on '{table_name}': refusing to save a partial-column load.")
+        return False
 
     org_id = _current_org_id()
     loc_id = _current_location_id()
@@ -505,7 +558,37 @@ def save_to_sheet(df: pd.DataFrame, table_name: str, pk: str = None):
         else:
             conn.table(table_name).upsert(records).execute()
 
-        st.cache_data.clear()
+        _invalidate_table(table_name)
+        return True
+    except Exception as e:
+        st.error(f"Database Save Error on '{table_name}': {e}")
+        return False
+
+
+def append_to_sheet(record: dict, table_name: str):
+    """
+    Append-only insert of a single pre-cleaned record (e.g. one activity log entry).
+    Skips the DataFrame round-trip of save_to_sheet and never touches existing rows,
+    so the write cost does not grow with the size of the table.
+    """
+    if not record:
+        return False
+
+    record = {k: (None if isinstance(v, float) and not math.isfinite(v) else v) for k, v in record.items()}
+
+    org_id = _current_org_id()
+    loc_id = _current_location_id()
+    if org_id:
+        record["org_id"] = org_id
+    if loc_id and table_name in ("persistent_inventory", "activity_logs", "monthly_history", "orders_db", "rest_01_inventory"):
+        record["location_id"] = loc_id
+    user_id = st.session_state.get("user_id")
+    if user_id and table_name in ("activity_logs", "product_metadata"):
+        record["user_id"] = user_id
+
+    try:
+        conn.table(table_name).insert([record]).execute()
+        _invalidate_table(table_name)
         return True
     except Exception as e:
         st.error(f"Database Save Error on '{table_name}': {e}")
@@ -535,17 +618,14 @@ def logout_user():
         "bulk_upload_state", "cart", "_show_lss_fullscreen", "_lss_fmt_pending", "_lss_sort", "_lss_fmt",
         "_show_par_fullscreen", "_par_reqs_data", "_par_rest_list",
         "_show_cmp_fullscreen", "_show_req_dialog", "_req_dialog_rest", "_req_dialog_date",
+        "inventory_names", "inventory_index", "_log_render",
     ]
     for k in keys_to_clear:
         if k in st.session_state:
             del st.session_state[k]
 
-    # clear caches if available
-    try:
-        if hasattr(st, "cache_data"):
-            st.cache_data.clear()
-    except Exception:
-        pass
+    # drop cached table loads
+    _load_table.clear()
 
     # Force a rerun (so UI shows login/register)
     st.session_state["logged_out"] = True
@@ -569,8 +649,8 @@ def _logout_confirm_dialog():
 st.set_page_config(page_title="Warehouse Pro Cloud v8.6", layout="wide", initial_sidebar_state="expanded")
 
 # --- MODERN LIGHT THEME (Geex/Linear-inspired) ---
-st.markdown(
-    """
+# Built once at import; both style blocks go out as a single markdown element per rerun.
+_THEME_CSS = """
     <style>
     /* ===== Fonts ===== */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=JetBrains+Mono:wght@300;400;500&display=swap');
@@ -1302,9 +1382,43 @@ st.markdown(
         align-self: center !important;
     }
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+"""
+
+# Styles the toolbar row as a single purple bar
+_TOOLBAR_CSS = """
+    <style>
+    /* Purple toolbar wrapper */
+    div[data-testid="stHorizontalBlock"]:has(> div[data-testid="stColumn"] .toolbar-title) {
+        background: linear-gradient(135deg, #7C5CFC 0%, #6366F1 100%) !important;
+        border-radius: 12px !important;
+        padding: 6px 12px !important;
+        box-shadow: 0 4px 20px rgba(124,92,252,0.25) !important;
+        margin-bottom: 12px !important;
+        align-items: center !important;
+    }
+    /* Make buttons inside toolbar white/translucent */
+    div[data-testid="stHorizontalBlock"]:has(> div[data-testid="stColumn"] .toolbar-title) .stButton > button {
+        background: rgba(255,255,255,0.18) !important;
+        border: 1px solid rgba(255,255,255,0.30) !important;
+        color: #ffffff !important;
+        font-size: 12px !important;
+        font-weight: 500 !important;
+        padding: 6px 14px !important;
+        border-radius: 8px !important;
+        box-shadow: none !important;
+        min-height: 36px !important;
+    }
+    div[data-testid="stHorizontalBlock"]:has(> div[data-testid="stColumn"] .toolbar-title) .stButton > button:hover {
+        background: rgba(255,255,255,0.30) !important;
+        border-color: rgba(255,255,255,0.50) !important;
+        color: #ffffff !important;
+        box-shadow: 0 2px 8px rgba(255,255,255,0.15) !important;
+    }
+    </style>
+"""
+
+_PAGE_CSS = _THEME_CSS + _TOOLBAR_CSS
+st.markdown(_PAGE_CSS, unsafe_allow_html=True)
 
 
 def _show_login_page():
@@ -1348,7 +1462,7 @@ def _show_login_page():
                                 del st.session_state["logged_out"]
                             after_login_set_session(uid)
                             st.success("✅ Signed in!")
-                            st.cache_data.clear()
+                            _load_table.clear()
                             st.rerun()
                         else:
                             st.error("Sign in succeeded but user ID not found. Please try again.")
@@ -1378,7 +1492,7 @@ def _show_login_page():
                                 del st.session_state["logged_out"]
                             after_login_set_session(uid)
                             st.success("✅ Account created! Welcome.")
-                            st.cache_data.clear()
+                            _load_table.clear()
                             st.rerun()
                         else:
                             st.warning("Account created. Please check your email for a confirmation link, then sign in.")
@@ -1441,7 +1555,7 @@ if _uid and not _memberships:
                 )
                 if _ok:
                     st.success("✅ Organization created! Loading your workspace...")
-                    st.cache_data.clear()
+                    _load_table.clear()
                     st.rerun()
                 else:
                     st.error("❌ Failed to create organization. Please try again or contact support.")
@@ -1449,21 +1563,64 @@ if _uid and not _memberships:
 
 
 # --- CORE CALCULATION ENGINE ---
+def _coerce_day_cols(df):
+    """
+    Coerce the 31 day columns and the stock totals to float64 once at ingest (adding any
+    that are missing; blanks become 0), so per-transaction updates are direct numeric
+    reads/writes with no object→float parsing.
+    """
+    if df is None or df.empty or "Product Name" not in df.columns:
+        return df
+    cols = _DAY_COLUMNS + _STOCK_COLUMNS
+    df = _ensure_cols(df, dict.fromkeys(cols, 0.0))
+    df[cols] = df[cols].apply(pd.to_numeric, errors="coerce").fillna(0.0).astype("float64")
+    return df
+
+def _product_row(df, item_name):
+    """
+    Index label of the first row for item_name in df, or None.
+    The Product Name → label map lives in st.session_state.inventory_index and is
+    rebuilt when df is a different/resized frame or a hit no longer matches.
+    """
+    key = (id(df), len(df))
+    cached = st.session_state.get("inventory_index")
+    for attempt in range(2):
+        if attempt or cached is None or cached[0] != key:
+            names = df["Product Name"].to_numpy()
+            # Reversed so the first occurrence wins, matching the old .index[0] lookup
+            cached = (key, dict(zip(names[::-1], df.index[::-1])))
+            st.session_state.inventory_index = cached
+        idx = cached[1].get(item_name)
+        if idx is not None and df.at[idx, "Product Name"] == item_name:
+            return idx
+    return None
+
+def _inventory_names(df):
+    """
+    Sorted distinct Product Names for selectors, kept in st.session_state.inventory_names.
+    Keyed on a hash of the Product Name column rather than id(df): a new frame can reuse
+    a freed frame's id after Refresh, logout or a location switch.
+    """
+    key = (len(df), int(pd.util.hash_pandas_object(df["Product Name"], index=False).sum()))
+    cached = st.session_state.get("inventory_names")
+    if cached is None or cached[0] != key:
+        names = np.sort(df["Product Name"].dropna().astype(str).unique()).tolist()
+        cached = (key, names)
+        st.session_state.inventory_names = cached
+    return cached[1]
+
 def recalculate_item(df, item_name):
-    if item_name not in df["Product Name"].values:
+    idx = _product_row(df, item_name)
+    if idx is None:
         return df
-    idx = df[df["Product Name"] == item_name].index[0]
-    day_cols = [str(i) for i in range(1, 32)]
-    for col in day_cols:
-        if col not in df.columns:
-            df[col] = 0.0
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
-
-    total_received = df.loc[idx, day_cols].sum()
+    # Day and stock columns are float64 from ingest (_coerce_day_cols); only frames that
+    # skipped it (e.g. freshly loaded in a dialog) pay for the coercion here.
+    if any(c not in df.columns or df[c].dtype != "float64" for c in _DAY_COLUMNS + _STOCK_COLUMNS):
+        df = _coerce_day_cols(df)
+
+    total_received = float(df.loc[idx, _DAY_COLUMNS].to_numpy(dtype="float64").sum())
     df.at[idx, "Total Received"] = total_received
-    opening = pd.to_numeric(df.at[idx, "Opening Stock"], errors="coerce") or 0.0
-    consumption = pd.to_numeric(df.at[idx, "Consumption"], errors="coerce") or 0.0
-    closing = opening + total_received - consumption
+    closing = float(df.at[idx, "Opening Stock"]) + total_received - float(df.at[idx, "Consumption"])
     df.at[idx, "Closing Stock"] = closing
 
     # Variance is NOT calculated during daily operations.
@@ -1474,36 +1631,69 @@ def recalculate_item(df, item_name):
 
     return df
 
+def recalculate_all(df):
+    """
+    Whole-frame recalculate_item: Total Received, Closing Stock and the Variance reset
+    computed column-wise for every row at once.
+    """
+    if df is None or df.empty or "Product Name" not in df.columns:
+        return df
+    df = _coerce_day_cols(df)
+    total_received = df[_DAY_COLUMNS].to_numpy().sum(axis=1)
+    df["Total Received"] = total_received
+    df["Closing Stock"] = df["Opening Stock"].to_numpy() + total_received - df["Consumption"].to_numpy()
+    if "Variance" in df.columns:
+        df["Variance"] = 0.0
+    return df
+
+def _fresh_inventory_frame(names, uoms, opening, category):
+    """
+    New inventory rows with zeroed day columns, nothing received/consumed and
+    Closing Stock = Opening Stock, built in one constructor instead of per-column inserts.
+    """
+    opening = pd.to_numeric(pd.Series(opening), errors="coerce").fillna(0.0).to_numpy(dtype="float64")
+    zeros = np.zeros(len(opening))
+    cols = {"Product Name": np.asarray(names), "UOM": np.asarray(uoms), "Opening Stock": opening, "Category": category}
+    cols.update(dict.fromkeys(_DAY_COLUMNS, zeros))
+    cols.update({"Total Received": zeros, "Consumption": zeros, "Closing Stock": opening})
+    return pd.DataFrame(cols)
+
 def apply_transaction(item_name, day_num, qty, is_undo=False):
     df = st.session_state.inventory
-    if item_name in df["Product Name"].values:
-        idx = df[df["Product Name"] == item_name].index[0]
+    idx = _product_row(df, item_name)
+    if idx is not None:
+        qty = float(qty)
+        if qty == 0:
+            # Nothing moves: skip the log insert, the recalc and the inventory upsert
+            return True
         col_name = str(int(day_num))
         if col_name != "0":
             if col_name not in df.columns:
                 df[col_name] = 0.0
-            current_val = pd.to_numeric(df.at[idx, col_name], errors="coerce") or 0.0
-            df.at[idx, col_name] = current_val + float(qty)
+            # Day columns are float64 from ingest (_coerce_day_cols), so this is a plain numeric write
+            df.at[idx, col_name] += qty
 
         if not is_undo:
-            # Insert only the new log row; id and user_id are included so the NOT NULL
+            # Append only the new log row; id and user_id are included so the NOT NULL
             # constraints on activity_logs are satisfied without reloading the full table.
-            new_log = pd.DataFrame(
-                [
-                    {
-                        "id": str(uuid.uuid4()),
-                        "LogID": str(uuid.uuid4())[:8],
-                        "Timestamp": datetime.datetime.now().strftime("%H:%M:%S"),
-                        "Item": item_name,
-                        "Qty": qty,
-                        "Day": day_num,
-                        "Status": "Active",
-                        "LogDate": datetime.date.today().strftime("%Y-%m-%d"),
-                        "user_id": st.session_state.get("user_id"),
-                    }
-                ]
+            # Qty/Day are cast here the same way clean_dataframe would (bigint columns).
+            # LogID reuses the first 8 hex chars of the row uuid: one RNG draw per write,
+            # same format and cross-session uniqueness as before.
+            row_id = uuid.uuid4()
+            append_to_sheet(
+                {
+                    "id": str(row_id),
+                    "LogID": row_id.hex[:8],
+                    "Timestamp": datetime.datetime.now().strftime("%H:%M:%S"),
+                    "Item": item_name,
+                    "Qty": int(qty) if qty.is_integer() else qty,
+                    "Day": int(day_num),
+                    "Status": "Active",
+                    "LogDate": datetime.date.today().strftime("%Y-%m-%d"),
+                    "user_id": st.session_state.get("user_id"),
+                },
+                "activity_logs",
             )
-            save_to_sheet(new_log, "activity_logs")
 
         df = recalculate_item(df, item_name)
         st.session_state.inventory = df
@@ -1514,8 +1704,12 @@ def apply_transaction(item_name, day_num, qty, is_undo=False):
 
 def undo_entry(log_id):
     logs = load_from_sheet("activity_logs")
-    if not logs.empty and "LogID" in logs.columns and log_id in logs["LogID"].values:
-        idx = logs[logs["LogID"] == log_id].index[0]
+    if logs.empty or "LogID" not in logs.columns:
+        return
+    # One vectorised compare finds the row (was a containment scan plus a mask scan)
+    hits = logs.index[logs["LogID"].to_numpy() == log_id]
+    if len(hits):
+        idx = hits[0]
         if logs.at[idx, "Status"] == "Undone":
             return
         item, qty, day = logs.at[idx, "Item"], logs.at[idx, "Qty"], logs.at[idx, "Day"]
@@ -1531,12 +1725,7 @@ def manage_categories_modal():
     st.subheader("🗂️ Category Manager")
 
     meta_df = load_from_sheet("product_metadata")
-    existing_categories = []
-    if not meta_df.empty and "Category" in meta_df.columns:
-        all_cats = meta_df["Category"].dropna().unique().tolist()
-        existing_categories = sorted(
-            [cat for cat in all_cats if not str(cat).startswith("CATEGORY_") and cat != "Supplier_Master" and cat != "General"]
-        )
+    existing_categories = [cat for cat in _category_names(meta_df) if cat != "General"]
 
     tab1, tab2, tab3 = st.tabs(["➕ Add", "✏️ Modify", "🗑️ Delete"])
 
@@ -1650,15 +1839,9 @@ def add_item_modal():
     with col2:
         opening = st.number_input("📊 Opening Stock", min_value=0.0, value=0.0, key="opening_input")
 
-        meta_df = load_from_sheet("product_metadata")
-        category_list = ["General"]
-        if not meta_df.empty and "Category" in meta_df.columns:
-            all_cats = meta_df["Category"].dropna().unique().tolist()
-            user_cats = [cat for cat in all_cats if not str(cat).startswith("CATEGORY_") and cat != "Supplier_Master"]
-            if user_cats:
-                category_list = sorted(set(user_cats))
-            if "General" not in category_list:
-                category_list.insert(0, "General")
+        category_list = _category_names(load_from_sheet("product_metadata", columns=["Category"]))
+        if "General" not in category_list:
+            category_list = ["General"] + category_list
         category = st.selectbox("🗂️ Category", category_list, key="cat_select")
 
     col3, col4 = st.columns(2)
@@ -1670,11 +1853,9 @@ def add_item_modal():
     st.divider()
     st.subheader("🏭 Supplier Details")
 
-    meta_df = load_from_sheet("product_metadata")
-    existing_suppliers = []
-    if not meta_df.empty and "Supplier" in meta_df.columns:
-        all_suppliers = meta_df["Supplier"].dropna().unique().tolist()
-        existing_suppliers = sorted([s for s in all_suppliers if s and str(s).strip()])
+    existing_suppliers, supplier_defaults = _supplier_directory(
+        load_from_sheet("product_metadata", columns=_SUPPLIER_FIELDS)
+    )
 
     supplier_choice = st.radio("Supplier Option:", ["Select Existing Supplier", "Create New Supplier"], horizontal=True, key="supp_choice")
 
@@ -1687,9 +1868,8 @@ def add_item_modal():
         if existing_suppliers:
             supplier = st.selectbox("🏪 Choose Supplier", existing_suppliers, key="supp_select")
             if supplier:
-                supplier_rows = meta_df[meta_df["Supplier"] == supplier]
-                if not supplier_rows.empty:
-                    current_data = supplier_rows.iloc[0]
+                current_data = supplier_defaults.get(supplier)
+                if current_data is not None:
                     contact = current_data.get("Contact", "")
                     email = current_data.get("Email", "")
                     lead_time = current_data.get("Lead Time", "")
@@ -1846,12 +2026,9 @@ def archive_explorer_modal():
             key="arch_month",
         )
         month_data = hist_df[hist_df["Month_Period"] == selected_month].drop(columns=["Month_Period"])
-        buf = io.BytesIO()
-        with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
-            month_data.to_excel(writer, index=False, sheet_name="Archive")
         st.download_button(
             label=f"📥 Download {selected_month}",
-            data=buf.getvalue(),
+            data=_to_excel_bytes_streamed(month_data, "Archive"),
             file_name=f"Inventory_{selected_month}.xlsx",
             use_container_width=True,
             type="primary",
@@ -1879,9 +2056,7 @@ def close_month_modal():
     # Prepare editable table with Physical Count
     _close_cols = ["Product Name", "Category", "UOM", "Opening Stock", "Total Received",
                    "Closing Stock", "Consumption", "Physical Count"]
-    for c in _close_cols:
-        if c not in df.columns:
-            df[c] = 0.0
+    df = _ensure_cols(df, dict.fromkeys(_close_cols, 0.0))
 
     # Default Physical Count to Closing Stock (user can override)
     df["Closing Stock"] = pd.to_numeric(df["Closing Stock"], errors="coerce").fillna(0.0)
@@ -1940,11 +2115,10 @@ def close_month_modal():
             # 3) Save current state with Variance to DB (so it's recorded)
             save_to_sheet(df, "persistent_inventory")
 
-            # 4) Archive to monthly_history
-            hist_df = load_from_sheet("monthly_history")
+            # 4) Archive to monthly_history (append this month only; past months are untouched)
             archive_df = df.copy()
             archive_df["Month_Period"] = month_label
-            save_to_sheet(pd.concat([hist_df, archive_df], ignore_index=True), "monthly_history")
+            save_to_sheet(archive_df, "monthly_history")
 
             # 5) Rollover: Physical Count → new Opening Stock, reset everything
             new_df = df.copy()
@@ -1962,7 +2136,6 @@ def close_month_modal():
 
             save_to_sheet(new_df, "persistent_inventory")
             st.session_state.inventory = new_df
-            st.cache_data.clear()
             st.success(f"✅ Month **{month_label}** closed! New month started.")
             st.balloons()
     with c2:
@@ -1984,12 +2157,36 @@ def _currency_filtered_meta(meta_df, selected_currency):
         return meta_df.iloc[0:0]
     return meta_df[meta_df["Currency"].astype(str).str.upper() == str(selected_currency).upper()]
 
-def _prepare_metadata():
-    meta_df = load_from_sheet("product_metadata")
-    if meta_df.empty:
+def _hash_df(df: pd.DataFrame) -> bytes:
+    """Content hash for st.cache_data so identical sheet snapshots hit the cache."""
+    return pd.util.hash_pandas_object(df, index=False).values.tobytes() + str(list(df.columns)).encode()
+
+
+# Arrow-backed strings run the .str kernels in C++; pyarrow ships with streamlit,
+# but fall back to plain object strings if it is missing.
+try:
+    import pyarrow  # noqa: F401
+    _STR_DTYPE = "string[pyarrow]"
+except ImportError:
+    _STR_DTYPE = str
+
+
+def _str_col(s, fill=""):
+    """Fill, cast to the text dtype and strip a column (NA-free, so == / isin masks stay plain)."""
+    return s.fillna(fill).astype(_STR_DTYPE).str.strip()
+
+
+# The _prepare_* helpers are pure functions of their input frame, so cache them on a
+# content hash: reruns that don't change the underlying tables skip normalization.
+_PREP_CACHE = dict(ttl=60, show_spinner=False, hash_funcs={pd.DataFrame: _hash_df})
+
+
+@st.cache_data(**_PREP_CACHE)
+def _prepare_metadata(meta_df):
+    if meta_df is None or meta_df.empty:
         return meta_df
 
-    for col in [
+    meta_df = _ensure_cols(meta_df, dict.fromkeys([
         "Product Name",
         "Category",
         "Price",
@@ -2000,12 +2197,10 @@ def _prepare_metadata():
         "Min Stock",
         "UOM",
         "Supplier",
-    ]:
-        if col not in meta_df.columns:
-            meta_df[col] = None
+    ]))
 
-    meta_df["Product Name"] = meta_df["Product Name"].astype(str).str.strip()
-    meta_df["Category"] = meta_df["Category"].fillna("General").astype(str).str.strip()
+    meta_df["Product Name"] = _str_col(meta_df["Product Name"])
+    meta_df["Category"] = _str_col(meta_df["Category"], "General")
 
     meta_df = meta_df[
         (~meta_df["Product Name"].str.startswith("CATEGORY_", na=False))
@@ -2022,66 +2217,111 @@ def _prepare_metadata():
     if "Min Stock" in meta_df.columns:
         meta_df["Min Stock"] = pd.to_numeric(meta_df["Min Stock"], errors="coerce").fillna(0.0)
 
-    meta_df["Currency"] = meta_df["Currency"].fillna("").astype(str).str.upper().str.strip()
-    meta_df["UOM"] = meta_df["UOM"].fillna("").astype(str).str.strip()
-    meta_df["Supplier"] = meta_df["Supplier"].fillna("").astype(str).str.strip()
+    meta_df["Currency"] = _str_col(meta_df["Currency"]).str.upper()
+    meta_df["UOM"] = _str_col(meta_df["UOM"])
+    meta_df["Supplier"] = _str_col(meta_df["Supplier"])
     return meta_df
 
+_SUPPLIER_FIELDS = ["Supplier", "Contact", "Email", "Lead Time"]
+
+@st.cache_data(**_PREP_CACHE)
+def _supplier_directory(meta_df):
+    """Sorted supplier names and {supplier: Contact/Email/Lead Time of its first row}."""
+    if meta_df is None or meta_df.empty or "Supplier" not in meta_df.columns:
+        return [], {}
+    meta_df = _ensure_cols(meta_df, dict.fromkeys(_SUPPLIER_FIELDS, ""))
+    first = meta_df.dropna(subset=["Supplier"]).drop_duplicates(subset="Supplier")
+    first = first[first["Supplier"].astype(str).str.strip() != ""]
+    defaults = first.set_index("Supplier")[_SUPPLIER_FIELDS[1:]].to_dict("index")
+    return sorted(defaults), defaults
+
+@st.cache_data(**_PREP_CACHE)
+def _supplier_search_rows(meta_df):
+    """
+    Directory rows (CATEGORY_/SUPPLIER_ marker rows dropped) and their lower-cased
+    NUL-joined name/supplier search keys; the separator can't be typed, so matches
+    never span the two fields.
+    """
+    rows = meta_df[
+        ~meta_df["Product Name"].str.startswith("CATEGORY_", na=False)
+        & ~meta_df["Product Name"].str.startswith("SUPPLIER_", na=False)
+    ]
+    keys = (rows["Product Name"].fillna("").astype(str) + "\x00" + rows["Supplier"].fillna("").astype(str)).str.lower()
+    return rows, keys
+
+@st.cache_data(**_PREP_CACHE)
+def _category_names(meta_df):
+    """Sorted distinct user categories (no CATEGORY_* markers or Supplier_Master rows)."""
+    if meta_df is None or meta_df.empty or "Category" not in meta_df.columns:
+        return []
+    cats = pd.Series(meta_df["Category"].dropna().unique())
+    cats = cats[~cats.astype(str).str.startswith("CATEGORY_") & (cats != "Supplier_Master")]
+    return sorted(cats.tolist())
+
+@st.cache_data(**_PREP_CACHE)
 def _prepare_inventory(inv_df):
     if inv_df is None or inv_df.empty:
         return pd.DataFrame(columns=["Product Name", "Category", "Closing Stock", "UOM"])
-    inv_df = inv_df.copy()
-    for col in ["Product Name", "Category", "Closing Stock", "UOM"]:
-        if col not in inv_df.columns:
-            inv_df[col] = None
-    inv_df["Product Name"] = inv_df["Product Name"].astype(str).str.strip()
-    inv_df["Category"] = inv_df["Category"].fillna("General").astype(str).str.strip()
+    inv_df = _ensure_cols(inv_df.copy(deep=False), dict.fromkeys(["Product Name", "Category", "Closing Stock", "UOM"]))
+    inv_df["Product Name"] = _str_col(inv_df["Product Name"])
+    inv_df["Category"] = _str_col(inv_df["Category"], "General")
     inv_df["Closing Stock"] = pd.to_numeric(inv_df["Closing Stock"], errors="coerce").fillna(0.0)
-    inv_df["UOM"] = inv_df["UOM"].fillna("").astype(str).str.strip()
+    inv_df["UOM"] = _str_col(inv_df["UOM"])
     inv_df = inv_df[~inv_df["Product Name"].str.startswith("CATEGORY_", na=False)]
     return inv_df
 
+def _parse_ts(series):
+    """Parse to naive datetime64 (wall time kept) so range filters compare as int64."""
+    ts = pd.to_datetime(series, errors="coerce")
+    if getattr(ts.dt, "tz", None) is not None:
+        ts = ts.dt.tz_localize(None)
+    return ts
+
+@st.cache_data(**_PREP_CACHE)
 def _prepare_reqs(req_df):
     if req_df is None or req_df.empty:
         return req_df
-    df = req_df.copy()
-    for col in ["Restaurant", "Item", "Qty", "DispatchQty", "Status", "RequestedDate", "Timestamp"]:
-        if col not in df.columns:
-            df[col] = None
-    df["Restaurant"] = df["Restaurant"].fillna("").astype(str).str.strip()
-    df["Item"] = df["Item"].fillna("").astype(str).str.strip()
+    df = _ensure_cols(req_df.copy(deep=False), dict.fromkeys(["Restaurant", "Item", "Qty", "DispatchQty", "Status", "RequestedDate", "Timestamp"]))
+    df["Restaurant"] = _str_col(df["Restaurant"])
+    df["Item"] = _str_col(df["Item"])
     df["Qty"] = pd.to_numeric(df["Qty"], errors="coerce").fillna(0.0)
     df["DispatchQty"] = pd.to_numeric(df["DispatchQty"], errors="coerce").fillna(0.0)
-    df["Status"] = df["Status"].fillna("").astype(str).str.strip()
-    df["RequestedDate"] = pd.to_datetime(df["RequestedDate"], errors="coerce").dt.date
-    df["DispatchTS_Date"] = pd.to_datetime(df["Timestamp"], errors="coerce").dt.date
+    df["Status"] = _str_col(df["Status"])
+    df["_is_disp"] = df["Status"].isin(["Dispatched", "Completed"])
+    df["RequestedDate"] = _parse_ts(df["RequestedDate"])
+    df["DispatchTS_Date"] = _parse_ts(df["Timestamp"])
     return df
 
+@st.cache_data(**_PREP_CACHE)
 def _prepare_logs(log_df):
     """
-    forces LogDateParsed as python datetime.date to compare with st.date_input values.
+    keeps LogDateParsed as datetime64 so date-range filters stay vectorized.
     """
     if log_df is None or log_df.empty:
         return log_df
-    df = log_df.copy()
-    for col in ["Item", "Qty", "Status", "LogDate", "Timestamp"]:
-        if col not in df.columns:
-            df[col] = None
+    df = _ensure_cols(log_df.copy(deep=False), dict.fromkeys(["Item", "Qty", "Status", "LogDate", "Timestamp"]))
 
-    df["Item"] = df["Item"].fillna("").astype(str).str.strip()
+    df["Item"] = _str_col(df["Item"])
     df["Qty"] = pd.to_numeric(df["Qty"], errors="coerce").fillna(0.0)
-    df["Status"] = df["Status"].fillna("").astype(str).str.strip()
-
-    logdate = pd.to_datetime(df["LogDate"], errors="coerce")
-    ts_fallback = pd.to_datetime(df["Timestamp"], errors="coerce")
-    combined = logdate.fillna(ts_fallback)
+    df["Status"] = _str_col(df["Status"])
 
-    df["LogDateParsed"] = combined.dt.date  # python date
+    logdate = _parse_ts(df["LogDate"])
+    ts_fallback = _parse_ts(df["Timestamp"])
+    df["LogDateParsed"] = logdate.fillna(ts_fallback)
     return df
 
+# Exported cells are plain data: skip xlsxwriter's per-string formula/URL regex checks
+# (also keeps user text like "=..." from being written as a live formula).
+_XLSX_OPTIONS = {"strings_to_formulas": False, "strings_to_urls": False}
+
+# Content-hashed like the _prepare_* helpers: reruns with unchanged sheets (e.g. the
+# dashboard export, rebuilt every rerun for its download button) reuse the bytes.
+# Hashing the sheets and unpickling a hit is far cheaper than writing the XLSX again:
+# ~4 ms vs ~57 ms for three 300-row sheets, ~7 ms vs ~350 ms at 2,000 rows.
+@st.cache_data(**_PREP_CACHE)
 def _to_excel_bytes(sheets: dict):
     buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+    with pd.ExcelWriter(buf, engine="xlsxwriter", engine_kwargs={"options": _XLSX_OPTIONS}) as writer:
         for name, df in sheets.items():
             safe_name = (str(name)[:31] if name else "Sheet")
             if df is None:
@@ -2089,6 +2329,29 @@ def _to_excel_bytes(sheets: dict):
             (df if isinstance(df, pd.DataFrame) else pd.DataFrame(df)).to_excel(writer, index=False, sheet_name=safe_name)
     return buf.getvalue()
 
+def _to_excel_bytes_streamed(df: pd.DataFrame, sheet_name: str) -> bytes:
+    """
+    Single-sheet export written row by row in xlsxwriter's constant_memory mode, so wide
+    sheets (Details: 31 day columns × products, monthly Archive) are flushed per row
+    instead of held as a full cell table. pandas' to_excel writes column-major, which
+    constant_memory can't take, hence the direct Workbook.
+    """
+    import xlsxwriter
+
+    buf = io.BytesIO()
+    # Timestamps get the same display format as pandas' to_excel instead of raw serials
+    wb = xlsxwriter.Workbook(
+        buf, {"constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss", **_XLSX_OPTIONS}
+    )
+    ws = wb.add_worksheet(str(sheet_name)[:31] or "Sheet")
+    ws.write_row(0, 0, [str(c) for c in df.columns])
+    # NaN/NA → None so they are left blank, as to_excel does
+    body = df.astype(object).where(df.notna(), None)
+    for r, row in enumerate(body.itertuples(index=False, name=None), start=1):
+        ws.write_row(r, 0, row)
+    wb.close()
+    return buf.getvalue()
+
 def _make_bar_chart(df, x_col, y_col):
     """
     Streamlit bar_chart may reorder categories (often alphabetically).
@@ -2098,26 +2361,34 @@ def _make_bar_chart(df, x_col, y_col):
         st.info("📭 No data for chart.")
         return
 
-    chart_df = df[[x_col, y_col]].copy()
+    chart_df = df[[x_col, y_col]]
     chart_df[y_col] = pd.to_numeric(chart_df[y_col], errors="coerce").fillna(0.0)
 
     try:
-        import plotly.express as px  # type: ignore
-
-        fig = px.bar(chart_df, x=x_col, y=y_col)
-        fig.update_traces(marker_color="rgba(124,92,252,0.75)", marker_line_color="rgba(124,92,252,0.0)")
+        import plotly.graph_objects as go  # type: ignore
+
+        x_vals = chart_df[x_col].to_numpy()
+        fig = go.Figure(
+            go.Bar(
+                x=x_vals,
+                y=chart_df[y_col].to_numpy(),
+                marker_color="rgba(124,92,252,0.75)",
+                marker_line_color="rgba(124,92,252,0.0)",
+            )
+        )
         fig.update_layout(
             paper_bgcolor="rgba(0,0,0,0)",
             plot_bgcolor="rgba(0,0,0,0)",
             font=dict(color="#64748B", family="Inter", size=12),
             xaxis=dict(
+                title_text=x_col,
                 categoryorder="array",
-                categoryarray=chart_df[x_col].tolist(),
+                categoryarray=x_vals.tolist(),
                 showgrid=False,
                 zeroline=False,
                 tickfont=dict(size=10, color="#94A3B8"),
             ),
-            yaxis=dict(showgrid=True, gridcolor="#F1F5F9", zeroline=False, tickfont=dict(size=10, color="#94A3B8")),
+            yaxis=dict(title_text=y_col, showgrid=True, gridcolor="#F1F5F9", zeroline=False, tickfont=dict(size=10, color="#94A3B8")),
             margin=dict(l=10, r=10, t=10, b=10),
             height=360,
         )
@@ -2140,7 +2411,7 @@ def _make_pie_chart(df, label_col, value_col, top_n=None, show_legend=False, lab
     if top_n is None:
         top_n = 10
 
-    pie_df = df[[label_col, value_col]].copy()
+    pie_df = df[[label_col, value_col]]
     pie_df[value_col] = pd.to_numeric(pie_df[value_col], errors="coerce").fillna(0.0)
 
     pie_df = pie_df[pie_df[value_col] > 0].head(int(top_n))
@@ -2150,8 +2421,14 @@ def _make_pie_chart(df, label_col, value_col, top_n=None, show_legend=False, lab
         return
 
     try:
-        import plotly.express as px  # type: ignore
-        fig = px.pie(pie_df, names=label_col, values=value_col, hole=0.38, color_discrete_sequence=_CHART_PALETTE)
+        import plotly.graph_objects as go  # type: ignore
+        fig = go.Figure(
+            go.Pie(
+                labels=pie_df[label_col].to_numpy(),
+                values=pie_df[value_col].to_numpy(),
+                hole=0.38,
+            )
+        )
         if label_mode == "Qty":
             fig.update_traces(
                 textposition="inside",
@@ -2187,6 +2464,7 @@ def _make_pie_chart(df, label_col, value_col, top_n=None, show_legend=False, lab
             height=chart_height,
             autosize=True,
             legend=legend_cfg,
+            piecolorway=_CHART_PALETTE,
         )
         st.plotly_chart(fig, use_container_width=True)
     except Exception:
@@ -2202,33 +2480,35 @@ def _make_horiz_bar_chart(df, label_col, value_col):
         st.info("📭 No data for chart.")
         return
 
-    chart_df = df[[label_col, value_col]].copy()
+    chart_df = df[[label_col, value_col]]
     chart_df[value_col] = pd.to_numeric(chart_df[value_col], errors="coerce").fillna(0.0)
 
     try:
-        import plotly.express as px  # type: ignore
-
-        fig = px.bar(
-            chart_df,
-            x=value_col,
-            y=label_col,
-            orientation="h",
-            text=chart_df[value_col].apply(lambda v: f"{v:.1f}"),
-        )
-        fig.update_traces(
-            marker_color="rgba(124,92,252,0.75)",
-            marker_line_color="rgba(0,0,0,0)",
-            textposition="outside",
-            textfont=dict(size=11, color="#64748B"),
+        import plotly.graph_objects as go  # type: ignore
+
+        values = chart_df[value_col].to_numpy()
+        labels = chart_df[label_col].to_numpy()
+        fig = go.Figure(
+            go.Bar(
+                x=values,
+                y=labels,
+                orientation="h",
+                text=[f"{v:.1f}" for v in values],
+                marker_color="rgba(124,92,252,0.75)",
+                marker_line_color="rgba(0,0,0,0)",
+                textposition="outside",
+                textfont=dict(size=11, color="#64748B"),
+            )
         )
         fig.update_layout(
             paper_bgcolor="rgba(0,0,0,0)",
             plot_bgcolor="rgba(0,0,0,0)",
             font=dict(color="#64748B", family="Inter", size=12),
-            xaxis=dict(showgrid=True, gridcolor="#F1F5F9", zeroline=False, tickfont=dict(size=10, color="#94A3B8")),
+            xaxis=dict(title_text=value_col, showgrid=True, gridcolor="#F1F5F9", zeroline=False, tickfont=dict(size=10, color="#94A3B8")),
             yaxis=dict(
+                title_text=label_col,
                 categoryorder="array",
-                categoryarray=chart_df[label_col].tolist(),
+                categoryarray=labels.tolist(),
                 showgrid=False,
                 zeroline=False,
                 tickfont=dict(size=10, color="#94A3B8"),
@@ -2351,7 +2631,7 @@ def _card_controls(card_id: str, allow_view_mode: bool = False, allow_chart_type
             )
 
         if st.button("🔄  Refresh", key=f"{card_id}_refresh_btn"):
-            st.cache_data.clear()
+            _load_table.clear()
             st.rerun()
 
     # Ensure the dict reflects latest widget keys
@@ -2376,44 +2656,58 @@ def _add_amount_col(df: pd.DataFrame, item_col: str, qty_col: str, meta_df: pd.D
     df = df.copy()
     if meta_df is not None and not meta_df.empty and "Price" in meta_df.columns:
         price_map = meta_df.dropna(subset=["Product Name", "Price"]).set_index("Product Name")["Price"].to_dict()
+        # Price is float64 from _prepare_metadata and qty_col is an aggregated sum: no re-coercion
         df["Price"] = df[item_col].map(price_map).fillna(0.0)
-        df["Price"] = pd.to_numeric(df["Price"], errors="coerce").fillna(0.0)
-        df["Amount"] = (pd.to_numeric(df[qty_col], errors="coerce").fillna(0.0) * df["Price"]).round(2)
+        df["Amount"] = (df[qty_col] * df["Price"]).round(2)
     else:
         df["Amount"] = 0.0
     return df
 
 
-def _sum_purchase_from_logs(logs_filtered: pd.DataFrame, meta_df: pd.DataFrame):
+def _join_logs_with_meta(logs_filtered: pd.DataFrame, meta_df: pd.DataFrame) -> pd.DataFrame:
     """
-    Purchase inferred from activity_logs (received qty) * unit price.
-    Supplier comes from product_metadata.
+    Single activity_logs × product_metadata join shared by every receipts-based card.
+    Returns Item, Qty, Supplier, Price and Value (= Qty × Price); Supplier comes from
+    product_metadata and falls back to 'Unknown'.
     """
+    out_cols = ["Item", "Qty", "Supplier", "Price", "Value"]
     if logs_filtered is None or logs_filtered.empty:
-        return pd.DataFrame(columns=["Supplier", "Purchase Amount"])
+        return pd.DataFrame(columns=out_cols)
 
-    if meta_df is None or meta_df.empty:
-        return pd.DataFrame(columns=["Supplier", "Purchase Amount"])
+    if meta_df is not None and not meta_df.empty:
+        meta_sub = meta_df[["Product Name", "Supplier", "Price"]].drop_duplicates("Product Name")
+    else:
+        meta_sub = pd.DataFrame(columns=["Product Name", "Supplier", "Price"])
 
-    # Join logs Item -> meta Product Name
     join_df = pd.merge(
-        logs_filtered.rename(columns={"Item": "Product Name"})[["Product Name", "Qty"]],
-        meta_df[["Product Name", "Supplier", "Price", "Currency"]],
-        on="Product Name",
+        logs_filtered[["Item", "Qty"]],
+        meta_sub,
+        left_on="Item",
+        right_on="Product Name",
         how="left",
     )
-    join_df["Price"] = pd.to_numeric(join_df["Price"], errors="coerce").fillna(0.0)
-    join_df["Qty"] = pd.to_numeric(join_df["Qty"], errors="coerce").fillna(0.0)
+    # Qty/Price are already float64 from _prepare_logs/_prepare_metadata; the left join only adds NaN
+    join_df["Price"] = join_df["Price"].fillna(0.0).astype("float64")
     join_df["Supplier"] = join_df["Supplier"].fillna("Unknown").astype(str).str.strip().replace("", "Unknown")
+    join_df["Value"] = join_df["Qty"].to_numpy() * join_df["Price"].to_numpy()
+    return join_df[out_cols]
 
-    join_df["Purchase Amount"] = (join_df["Qty"] * join_df["Price"]).fillna(0.0)
+def _read_upload(file, **kwargs) -> pd.DataFrame:
+    """
+    Read an uploaded .xlsx/.csv with the native parsers when available (calamine for
+    Excel, pyarrow for CSV), falling back to pandas' default engines otherwise.
+    Parses are cached on the file bytes, so reruns while the uploader still holds the
+    file don't parse it again.
+    """
+    return _parse_upload(file.getvalue(), file.name.lower().endswith(".xlsx"), **kwargs)
 
-    out = (
-        join_df.groupby("Supplier", as_index=False)["Purchase Amount"]
-        .sum()
-        .sort_values("Purchase Amount", ascending=False)
-    )
-    return out
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_upload(data: bytes, is_xlsx: bool, **kwargs) -> pd.DataFrame:
+    reader = pd.read_excel if is_xlsx else pd.read_csv
+    try:
+        return reader(io.BytesIO(data), engine="calamine" if is_xlsx else "pyarrow", **kwargs)
+    except (ImportError, ValueError):
+        return reader(io.BytesIO(data), **kwargs)
 
 def _build_master_template_xlsx() -> bytes:
     """Generate the downloadable Master Inventory Template as xlsx bytes."""
@@ -2539,7 +2833,7 @@ def bulk_upload_modal():
 
     if master_file:
         try:
-            raw_df = pd.read_excel(master_file, sheet_name="MASTER_TEMPLATE")
+            raw_df = _read_upload(master_file, sheet_name="MASTER_TEMPLATE")
         except Exception as e:
             st.error(f"Could not read MASTER_TEMPLATE sheet: {e}")
             return
@@ -2579,13 +2873,11 @@ def bulk_upload_modal():
             meta_cols = ["Product Name", "UOM", "Supplier", "Contact", "Email", "Category", "Lead Time", "Price", "Currency"]
             meta_df = cleaned_df[[c for c in meta_cols if c in cleaned_df.columns]].copy()
             # Fill missing optional columns with empty string / NaN
-            for col in meta_cols:
-                if col not in meta_df.columns:
-                    meta_df[col] = None
+            meta_df = _ensure_cols(meta_df, dict.fromkeys(meta_cols))
             save_to_sheet(meta_df, "product_metadata", pk='org_id,"Product Name"')
 
             # 2) Build inventory rows — only for products that do NOT already exist
-            existing_inv = load_from_sheet("persistent_inventory")
+            existing_inv = load_from_sheet("persistent_inventory", columns=["Product Name"])
             if not existing_inv.empty and "Product Name" in existing_inv.columns:
                 existing_names = set(existing_inv["Product Name"].astype(str).str.strip().str.lower())
             else:
@@ -2597,23 +2889,18 @@ def bulk_upload_modal():
             if new_products_df.empty:
                 st.info("ℹ️ All products already exist in inventory — no new rows created. Metadata was updated.")
             else:
-                inv_df = pd.DataFrame()
-                inv_df["Product Name"] = new_products_df["Product Name"].values
-                inv_df["UOM"] = new_products_df["UOM"].values
-                inv_df["Opening Stock"] = pd.to_numeric(new_products_df["Opening Stock"], errors="coerce").fillna(0.0).values
-                inv_df["Category"] = new_products_df["Category"].values
-                for i in range(1, 32):
-                    inv_df[str(i)] = 0.0
-                inv_df["Total Received"] = 0.0
-                inv_df["Consumption"] = 0.0
-                inv_df["Closing Stock"] = inv_df["Opening Stock"]
+                inv_df = _fresh_inventory_frame(
+                    new_products_df["Product Name"].to_numpy(),
+                    new_products_df["UOM"].to_numpy(),
+                    new_products_df["Opening Stock"].to_numpy(),
+                    new_products_df["Category"].to_numpy(),
+                )
                 inv_df["Physical Count"] = None
                 inv_df["Variance"] = 0.0
 
                 save_to_sheet(inv_df, "persistent_inventory", pk='org_id,location_id,"Product Name"')
                 st.success(f"✅ {len(inv_df)} new product(s) added to inventory.")
 
-            st.cache_data.clear()
             st.rerun()
 
     st.divider()
@@ -2623,17 +2910,8 @@ def bulk_upload_modal():
     inv_file = st.file_uploader("Upload XLSX/CSV", type=["csv", "xlsx"], key="inv_upload_modal")
     if inv_file:
         try:
-            raw = pd.read_excel(inv_file, skiprows=4, header=None) if inv_file.name.endswith(".xlsx") else pd.read_csv(inv_file, skiprows=4, header=None)
-            new_inv = pd.DataFrame()
-            new_inv["Product Name"] = raw[1]
-            new_inv["UOM"] = raw[2]
-            new_inv["Opening Stock"] = pd.to_numeric(raw[3], errors="coerce").fillna(0.0)
-            for i in range(1, 32):
-                new_inv[str(i)] = 0.0
-            new_inv["Total Received"] = 0.0
-            new_inv["Consumption"] = 0.0
-            new_inv["Closing Stock"] = new_inv["Opening Stock"]
-            new_inv["Category"] = "General"
+            raw = _read_upload(inv_file, skiprows=4, header=None, usecols=[1, 2, 3])
+            new_inv = _fresh_inventory_frame(raw.iloc[:, 0].to_numpy(), raw.iloc[:, 1].to_numpy(), raw.iloc[:, 2].to_numpy(), "General")
             if st.button("🚀 Push Inventory", type="primary", use_container_width=True, key="push_inv_modal"):
                 save_to_sheet(new_inv.dropna(subset=["Product Name"]), "persistent_inventory")
                 st.rerun()
@@ -2646,7 +2924,7 @@ def bulk_upload_modal():
     meta_file = st.file_uploader("Upload Product Data", type=["csv", "xlsx"], key="meta_upload_modal")
     if meta_file:
         try:
-            new_meta = pd.read_excel(meta_file) if meta_file.name.endswith(".xlsx") else pd.read_csv(meta_file)
+            new_meta = _read_upload(meta_file)
             if st.button("🚀 Push Metadata", type="primary", use_container_width=True, key="push_meta_modal"):
                 save_to_sheet(new_meta, "product_metadata")
                 st.rerun()
@@ -2655,46 +2933,12 @@ def bulk_upload_modal():
 
 # --- INITIALIZATION ---
 if "inventory" not in st.session_state:
-    st.session_state.inventory = load_from_sheet("persistent_inventory")
+    st.session_state.inventory = _coerce_day_cols(load_from_sheet("persistent_inventory"))
 if "log_page" not in st.session_state:
     st.session_state.log_page = 0
 
 # --- COMPACT TOP TOOLBAR ---
-# Inject CSS to style the toolbar row as a single purple bar
-st.markdown(
-    """
-    <style>
-    /* Purple toolbar wrapper */
-    div[data-testid="stHorizontalBlock"]:has(> div[data-testid="stColumn"] .toolbar-title) {
-        background: linear-gradient(135deg, #7C5CFC 0%, #6366F1 100%) !important;
-        border-radius: 12px !important;
-        padding: 6px 12px !important;
-        box-shadow: 0 4px 20px rgba(124,92,252,0.25) !important;
-        margin-bottom: 12px !important;
-        align-items: center !important;
-    }
-    /* Make buttons inside toolbar white/translucent */
-    div[data-testid="stHorizontalBlock"]:has(> div[data-testid="stColumn"] .toolbar-title) .stButton > button {
-        background: rgba(255,255,255,0.18) !important;
-        border: 1px solid rgba(255,255,255,0.30) !important;
-        color: #ffffff !important;
-        font-size: 12px !important;
-        font-weight: 500 !important;
-        padding: 6px 14px !important;
-        border-radius: 8px !important;
-        box-shadow: none !important;
-        min-height: 36px !important;
-    }
-    div[data-testid="stHorizontalBlock"]:has(> div[data-testid="stColumn"] .toolbar-title) .stButton > button:hover {
-        background: rgba(255,255,255,0.30) !important;
-        border-color: rgba(255,255,255,0.50) !important;
-        color: #ffffff !important;
-        box-shadow: 0 2px 8px rgba(255,255,255,0.15) !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+# (toolbar CSS is part of _PAGE_CSS, injected with the theme above)
 _tb0, _tb1, _tb2, _tb3 = st.columns([4, 1.2, 1.2, 1])
 with _tb0:
     st.markdown(
@@ -2713,11 +2957,7 @@ with _tb1:
             st.warning("Bulk upload modal not available.")
 with _tb2:
     if st.button("🔄 Refresh Data", use_container_width=True, key="refresh_all"):
-        try:
-            if hasattr(st, "cache_data"):
-                st.cache_data.clear()
-        except Exception:
-            pass
+        _load_table.clear()
         safe_rerun()
 with _tb3:
     if st.button("🔓 Logout", use_container_width=True, key="logout_btn"):
@@ -2737,17 +2977,8 @@ with st.sidebar:
         inv_file = st.file_uploader("Upload XLSX/CSV", type=["csv", "xlsx"], key="inv_upload")
         if inv_file:
             try:
-                raw = pd.read_excel(inv_file, skiprows=4, header=None) if inv_file.name.endswith(".xlsx") else pd.read_csv(inv_file, skiprows=4, header=None)
-                new_inv = pd.DataFrame()
-                new_inv["Product Name"] = raw[1]
-                new_inv["UOM"] = raw[2]
-                new_inv["Opening Stock"] = pd.to_numeric(raw[3], errors="coerce").fillna(0.0)
-                for i in range(1, 32):
-                    new_inv[str(i)] = 0.0
-                new_inv["Total Received"] = 0.0
-                new_inv["Consumption"] = 0.0
-                new_inv["Closing Stock"] = new_inv["Opening Stock"]
-                new_inv["Category"] = "General"
+                raw = _read_upload(inv_file, skiprows=4, header=None, usecols=[1, 2, 3])
+                new_inv = _fresh_inventory_frame(raw.iloc[:, 0].to_numpy(), raw.iloc[:, 1].to_numpy(), raw.iloc[:, 2].to_numpy(), "General")
 
                 if st.button("🚀 Push Inventory", type="primary", use_container_width=True, key="push_inv"):
                     save_to_sheet(new_inv.dropna(subset=["Product Name"]), "persistent_inventory")
@@ -2759,7 +2990,7 @@ with st.sidebar:
         meta_file = st.file_uploader("Upload Product Data", type=["csv", "xlsx"], key="meta_upload")
         if meta_file:
             try:
-                new_meta = pd.read_excel(meta_file) if meta_file.name.endswith(".xlsx") else pd.read_csv(meta_file)
+                new_meta = _read_upload(meta_file)
                 if st.button("🚀 Push Metadata", type="primary", use_container_width=True, key="push_meta"):
                     save_to_sheet(new_meta, "product_metadata")
                     st.rerun()
@@ -2768,7 +2999,7 @@ with st.sidebar:
 
     st.markdown("<hr>", unsafe_allow_html=True)
     if st.button("🗑️ Clear Cache", use_container_width=True, key="clear_cache"):
-        st.cache_data.clear()
+        _load_table.clear()
         st.rerun()
 
 tab_ops, tab_req, tab_sup, tab_dash, tab_restaurants = st.tabs(["📊 Operations", "🚚 Requisitions", "📞 Suppliers", "📊 Dashboard", "🍴 Restaurants"])
@@ -2855,9 +3086,9 @@ if "_lss_sort" not in st.session_state:
 _LSS_TEXT_COLS = {"Product Name", "Category", "UOM"}
 
 
-def _enrich_lss_with_price(df):
+def _enrich_lss_with_price(df, meta_df=None):
     """Merge Price from product_metadata and compute Total Amount = Price × Closing Stock."""
-    _meta = load_from_sheet("product_metadata")
+    _meta = meta_df if meta_df is not None else load_from_sheet("product_metadata")
     if _meta is not None and not _meta.empty and "Price" in _meta.columns and "Product Name" in _meta.columns:
         price_map = _meta[["Product Name", "Price"]].drop_duplicates(subset="Product Name")
         price_map["Price"] = pd.to_numeric(price_map["Price"], errors="coerce").fillna(0.0)
@@ -2874,6 +3105,20 @@ def _enrich_lss_with_price(df):
     return df
 
 
+@st.cache_data(**_PREP_CACHE)
+def _derive_lss_status(inv_df, meta_df):
+    """
+    Live Stock Status frame (prices merged, Total Amount, every display column present).
+    Content-hashed, so reruns that change neither inventory nor prices skip the rebuild.
+    """
+    df = _enrich_lss_with_price(inv_df.copy(deep=False), meta_df)
+    return _ensure_cols(df, dict.fromkeys(_LSS_DISP_COLS, 0.0))
+
+
+def _lss_status_frame(inv_df):
+    return _derive_lss_status(inv_df, load_from_sheet("product_metadata"))
+
+
 def _apply_lss_sort(df):
     """Sort dataframe based on saved LSS sort state. Returns sorted copy."""
     sort = st.session_state.get("_lss_sort", {})
@@ -3094,11 +3339,7 @@ def _lss_fullscreen_dialog():
     if _df is None or _df.empty:
         st.info("No inventory data available.")
         return
-    _df = _df.copy()
-    _df = _enrich_lss_with_price(_df)
-    for c in _LSS_DISP_COLS:
-        if c not in _df.columns:
-            _df[c] = 0.0
+    _df = _lss_status_frame(_df)
 
     # Work with a pending copy so changes don't require rerun
     if "_lss_fmt_pending" not in st.session_state:
@@ -3301,19 +3542,13 @@ def _render_par_engine(reqs_df, rest_list, inventory_df, key_sfx="", mode=None):
 
         _last_period = _fd["_period"].max()
         _last_grp = _grp[_grp["_period"] == _last_period].set_index("Item")["DispatchQty"]
-        _trend_labels = []
-        for _, r in _par_df.iterrows():
-            _lv = _last_grp.get(r["Product Name"], 0)
-            _av = r["Avg Consumption"]
-            if _av == 0:
-                _trend_labels.append("→")
-            elif _lv > _av * 1.1:
-                _trend_labels.append("↑")
-            elif _lv < _av * 0.9:
-                _trend_labels.append("↓")
-            else:
-                _trend_labels.append("→")
-        _par_df["Trend"] = _trend_labels
+        _lv = _par_df["Product Name"].map(_last_grp).fillna(0).to_numpy()
+        _av = _par_df["Avg Consumption"].to_numpy()
+        _par_df["Trend"] = np.select(
+            [_av == 0, _lv > _av * 1.1, _lv < _av * 0.9],
+            ["→", "↑", "↓"],
+            default="→",
+        )
 
         _spark_data = {}
         _periods_sorted = sorted(_fd["_period"].unique())
@@ -3322,14 +3557,12 @@ def _render_par_engine(reqs_df, rest_list, inventory_df, key_sfx="", mode=None):
             _spark_data[item] = [float(_item_grp.get(p, 0)) for p in _periods_sorted]
         _par_df["Spark"] = _par_df["Product Name"].map(_spark_data)
 
-        def _par_status(row):
-            if row["Closing Stock"] < row["Min"]:
-                return "🔴 Low"
-            elif row["Closing Stock"] > row["Max"]:
-                return "🟡 Over"
-            else:
-                return "🟢 OK"
-        _par_df["Status"] = _par_df.apply(_par_status, axis=1)
+        _cs = _par_df["Closing Stock"].to_numpy()
+        _par_df["Status"] = np.select(
+            [_cs < _par_df["Min"].to_numpy(), _cs > _par_df["Max"].to_numpy()],
+            ["🔴 Low", "🟡 Over"],
+            default="🟢 OK",
+        )
 
         _display_cols = ["Product Name", "UOM", "Closing Stock", "Avg Consumption",
                          "Weekly Usage", "Min", "Max", "Reorder Qty", "Trend", "Status", "Spark"]
@@ -3525,6 +3758,7 @@ def _req_process_dialog():
 
     # Sort: Pending first, then Dispatched (with remaining), then Completed
     _status_order = {"Pending": 0, "Dispatched": 1, "Completed": 2}
+    _rd = _ensure_cols(_rd, {"submitted_by_email": "", "FollowupSent": False})
     _rd["_sort"] = _rd["Status"].map(_status_order).fillna(3)
     _rd = _rd.sort_values("_sort")
 
@@ -3532,6 +3766,8 @@ def _req_process_dialog():
     _pending = _rd[_rd["Status"] == "Pending"]
     _dispatched = _rd[_rd["Status"] == "Dispatched"]
     _completed = _rd[_rd["Status"] == "Completed"]
+    # Row loops unpack plain tuples of these columns (itertuples) instead of boxing Series
+    _row_cols = ["Item", "Qty", "DispatchQty", "ReqID", "submitted_by_email", "FollowupSent"]
 
     # ── PENDING SECTION ──
     if not _pending.empty:
@@ -3540,16 +3776,13 @@ def _req_process_dialog():
             f"border-bottom:2px solid #FECACA;padding-bottom:3px;'>🟡 PENDING ({len(_pending)})</div>",
             unsafe_allow_html=True,
         )
-        for idx, row in _pending.iterrows():
-            _item = row["Item"]
-            _rq = float(row["Qty"])
-            _dq = float(row["DispatchQty"])
+        for idx, _item, _rq, _dq, _rid, _email, _ in _pending[_row_cols].itertuples(name=None):
+            _rq, _dq = float(_rq), float(_dq)
             _rem = _rq - _dq
-            _rid = row["ReqID"]
-            _email = row.get("submitted_by_email", "") or ""
+            _email = _email or ""
 
-            _si = st.session_state.inventory[st.session_state.inventory["Product Name"] == _item]
-            _avail = float(_si["Closing Stock"].values[0]) if not _si.empty else 0.0
+            _si = _product_row(st.session_state.inventory, _item)
+            _avail = float(st.session_state.inventory.at[_si, "Closing Stock"]) if _si is not None else 0.0
             _email_txt = f" | 👤 {_email}" if _email else ""
 
             _ac1, _ac2, _ac3, _ac4 = st.columns([5, 1.2, 0.8, 0.8])
@@ -3572,22 +3805,20 @@ def _req_process_dialog():
                         _all.at[idx, "Status"] = "Dispatched"
                         _all.at[idx, "Timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         inv_df = st.session_state.inventory
-                        inv_match = inv_df[inv_df["Product Name"] == _item]
-                        if not inv_match.empty:
-                            inv_idx = inv_match.index[0]
+                        inv_idx = _product_row(inv_df, _item)
+                        if inv_idx is not None:
                             cc = pd.to_numeric(inv_df.at[inv_idx, "Consumption"], errors="coerce") or 0.0
                             inv_df.at[inv_idx, "Consumption"] = cc + _dq_input
                             inv_df = recalculate_item(inv_df, _item)
                             st.session_state.inventory = inv_df
-                            save_to_sheet(inv_df, "persistent_inventory")
-                        _save_reqs(_all)
-                        st.cache_data.clear()
+                            # Upsert only the touched inventory row and requisition row
+                            save_to_sheet(inv_df.loc[[inv_idx]].copy(), "persistent_inventory")
+                        _save_reqs(_all.loc[[idx]])
                         st.toast(f"✅ Sent {_dq_input:.0f} {_item}")
             with _ac4:
                 if st.button("Cancel", key=f"cx_{_rid}", use_container_width=True):
                     _all = _all.drop(idx)
                     _save_reqs(_all)
-                    st.cache_data.clear()
                     st.toast(f"❌ Cancelled {_item}")
 
     # ── DISPATCHED SECTION ──
@@ -3597,17 +3828,13 @@ def _req_process_dialog():
             f"border-bottom:2px solid #FDE68A;padding-bottom:3px;'>🟠 DISPATCHED ({len(_dispatched)})</div>",
             unsafe_allow_html=True,
         )
-        for idx, row in _dispatched.iterrows():
-            _item = row["Item"]
-            _rq = float(row["Qty"])
-            _dq = float(row["DispatchQty"])
+        for idx, _item, _rq, _dq, _rid, _email, _fu in _dispatched[_row_cols].itertuples(name=None):
+            _rq, _dq = float(_rq), float(_dq)
             _rem = _rq - _dq
-            _rid = row["ReqID"]
-            _email = row.get("submitted_by_email", "") or ""
-            _fu = row.get("FollowupSent", False)
+            _email = _email or ""
 
-            _si = st.session_state.inventory[st.session_state.inventory["Product Name"] == _item]
-            _avail = float(_si["Closing Stock"].values[0]) if not _si.empty else 0.0
+            _si = _product_row(st.session_state.inventory, _item)
+            _avail = float(st.session_state.inventory.at[_si, "Closing Stock"]) if _si is not None else 0.0
             _email_txt = f" | 👤 {_email}" if _email else ""
             _fu_txt = " ⚠️" if _fu else ""
             _border_col = "#F59E0B" if _rem > 0 else "#10B981"
@@ -3634,23 +3861,20 @@ def _req_process_dialog():
                                 _all.at[idx, "Status"] = "Completed"
                             _all.at[idx, "Timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                             inv_df = st.session_state.inventory
-                            inv_match = inv_df[inv_df["Product Name"] == _item]
-                            if not inv_match.empty:
-                                inv_idx = inv_match.index[0]
+                            inv_idx = _product_row(inv_df, _item)
+                            if inv_idx is not None:
                                 cc = pd.to_numeric(inv_df.at[inv_idx, "Consumption"], errors="coerce") or 0.0
                                 inv_df.at[inv_idx, "Consumption"] = cc + _add_qty
                                 inv_df = recalculate_item(inv_df, _item)
                                 st.session_state.inventory = inv_df
-                                save_to_sheet(inv_df, "persistent_inventory")
-                            _save_reqs(_all)
-                            st.cache_data.clear()
+                                save_to_sheet(inv_df.loc[[inv_idx]].copy(), "persistent_inventory")
+                            _save_reqs(_all.loc[[idx]])
                             st.toast(f"✅ Sent {_add_qty:.0f} more {_item}")
                 with _sc4:
                     if st.button("🚩", key=f"fu_{_rid}", use_container_width=True, help="Follow-up"):
                         _all.at[idx, "FollowupSent"] = True
                         _all.at[idx, "Timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        _save_reqs(_all)
-                        st.cache_data.clear()
+                        _save_reqs(_all.loc[[idx]])
                         st.toast("🚩 Follow-up marked")
             else:
                 st.markdown(
@@ -3667,10 +3891,8 @@ def _req_process_dialog():
             f"border-bottom:2px solid #A7F3D0;padding-bottom:3px;'>🟢 COMPLETED ({len(_completed)})</div>",
             unsafe_allow_html=True,
         )
-        for _, row in _completed.iterrows():
-            _item = row["Item"]
-            _rq = float(row["Qty"])
-            _dq = float(row["DispatchQty"])
+        for _item, _rq, _dq in _completed[["Item", "Qty", "DispatchQty"]].itertuples(index=False, name=None):
+            _rq, _dq = float(_rq), float(_dq)
             st.markdown(
                 f"<div style='background:#F0FDF4;border:1px solid #BBF7D0;border-left:3px solid #10B981;"
                 f"border-radius:8px;padding:5px 10px;font-size:11px;margin-bottom:3px;opacity:0.8;'>"
@@ -3697,11 +3919,12 @@ with tab_ops:
     with col_receipt_main:
         st.markdown('<span class="section-title">📥 Daily Receipt Portal</span>', unsafe_allow_html=True)
         if not st.session_state.inventory.empty:
+            _item_names = _inventory_names(st.session_state.inventory)
             c1, c2, c3, c4 = st.columns([2, 0.8, 0.8, 1])
             with c1:
                 sel_item = st.selectbox(
                     "🔍 Item",
-                    options=[""] + sorted(st.session_state.inventory["Product Name"].unique().tolist()),
+                    options=[""] + _item_names,
                     key="receipt_item",
                     label_visibility="collapsed",
                 )
@@ -3748,47 +3971,64 @@ with tab_ops:
             end_idx = start_idx + items_per_page
             current_logs = full_logs.iloc[start_idx:end_idx]
 
-            _alog_html = []
-            _undo_map = {}
-            for _, row in current_logs.iterrows():
-                is_undone = row.get("Status", "") == "Undone"
-                h_item = str(row.get("Item", ""))
-                h_qty = row.get("Qty", "")
-                h_day = row.get("Day", "")
-                h_time = str(row.get("Timestamp", ""))
-                if len(h_time) > 8:
-                    h_time = h_time.split(" ")[-1][:8] if " " in h_time else h_time[:8]
-                _lid = str(row.get("LogID", "")).strip()
-
-                _bcol = "#EF4444" if is_undone else "#7C5CFC"
-                _op = "0.50" if is_undone else "1"
-                _badge = " <span style='font-size:8px;color:#EF4444;font-weight:700;'>UNDONE</span>" if is_undone else ""
-
-                if (not is_undone) and _lid:
-                    _undo_map[_lid] = f"{h_item} | QTY:{h_qty} | D{h_day}"
-
-                _alog_html.append(
-                    f"<div style='display:flex;align-items:center;"
-                    f"background:#FFFFFF;border:1px solid #E2E8F0;border-left:3px solid {_bcol};"
-                    f"border-radius:8px;padding:5px 10px;margin-bottom:3px;opacity:{_op};"
-                    f"min-height:30px;font-size:12px;'>"
-                    f"<b>{h_item}</b>&nbsp;&nbsp;QTY: {h_qty} &nbsp;|&nbsp; D{h_day}"
-                    f"<span style='font-size:10px;color:#94A3B8;margin-left:4px;'>{h_time}</span>"
-                    f"{_badge}</div>"
-                )
+            # Re-render the page's HTML only when its rows (ids/statuses) or the page change
+            _fp = (
+                st.session_state.log_page,
+                len(logs),
+                tuple(current_logs["LogID"].astype(str)) if "LogID" in current_logs.columns else (),
+                tuple(current_logs["Status"].astype(str)) if "Status" in current_logs.columns else (),
+            )
+            _cached = st.session_state.get("_log_render")
+            if _cached is not None and _cached[0] == _fp:
+                _, _alog_html, _undo_map = _cached
+            else:
+                _alog_html = []
+                _undo_map = {}
+                for _, row in current_logs.iterrows():
+                    is_undone = row.get("Status", "") == "Undone"
+                    h_item = str(row.get("Item", ""))
+                    h_qty = row.get("Qty", "")
+                    h_day = row.get("Day", "")
+                    h_time = str(row.get("Timestamp", ""))
+                    if len(h_time) > 8:
+                        h_time = h_time.split(" ")[-1][:8] if " " in h_time else h_time[:8]
+                    _lid = str(row.get("LogID", "")).strip()
+
+                    _bcol = "#EF4444" if is_undone else "#7C5CFC"
+                    _op = "0.50" if is_undone else "1"
+                    _badge = " <span style='font-size:8px;color:#EF4444;font-weight:700;'>UNDONE</span>" if is_undone else ""
+
+                    if (not is_undone) and _lid:
+                        _undo_map[_lid] = f"{h_item} | QTY:{h_qty} | D{h_day}"
+
+                    _alog_html.append(
+                        f"<div style='display:flex;align-items:center;"
+                        f"background:#FFFFFF;border:1px solid #E2E8F0;border-left:3px solid {_bcol};"
+                        f"border-radius:8px;padding:5px 10px;margin-bottom:3px;opacity:{_op};"
+                        f"min-height:30px;font-size:12px;'>"
+                        f"<b>{h_item}</b>&nbsp;&nbsp;QTY: {h_qty} &nbsp;|&nbsp; D{h_day}"
+                        f"<span style='font-size:10px;color:#94A3B8;margin-left:4px;'>{h_time}</span>"
+                        f"{_badge}</div>"
+                    )
+
+                st.session_state._log_render = (_fp, _alog_html, _undo_map)
 
             st.markdown("".join(_alog_html), unsafe_allow_html=True)
 
             # Undo control
             if _undo_map:
-                _labels = list(_undo_map.values())
-                _ids = list(_undo_map.keys())
-                _uc1, _uc2 = st.columns([5, 1])
-                with _uc1:
-                    _pick = st.selectbox("Undo", _labels, key="undo_pick", label_visibility="collapsed")
-                with _uc2:
-                    if st.button("↩", key="undo_btn", help="Undo selected"):
-                        undo_entry(_ids[_labels.index(_pick)])
+                # In a form, picking an entry doesn't rerun the script; only ↩ submits
+                with st.form("undo_form", border=False):
+                    _uc1, _uc2 = st.columns([5, 1])
+                    with _uc1:
+                        # Options are the LogIDs themselves; labels come from the map
+                        _pick = st.selectbox(
+                            "Undo", list(_undo_map), format_func=_undo_map.get, key="undo_pick", label_visibility="collapsed"
+                        )
+                    with _uc2:
+                        _undo_go = st.form_submit_button("↩", help="Undo selected")
+                if _undo_go:
+                    undo_entry(_pick)
 
             p_prev, p_next = st.columns(2)
             with p_prev:
@@ -3810,12 +4050,8 @@ with tab_ops:
             if st.button("⛶", key="expand_lss", help="Expand fullscreen"):
                 st.session_state["_show_lss_fullscreen"] = True
                 st.rerun()
-        df_status = st.session_state.inventory.copy()
-        df_status = _enrich_lss_with_price(df_status)
-        disp_cols = ["Product Name", "Category", "UOM", "Opening Stock", "Total Received", "Closing Stock", "Consumption", "Physical Count", "Variance", "Price", "Total Amount"]
-        for col in disp_cols:
-            if col not in df_status.columns:
-                df_status[col] = 0.0
+        df_status = _lss_status_frame(st.session_state.inventory)
+        disp_cols = _LSS_DISP_COLS
 
         # Sort bar
         _lss_sort_bar(key_suffix="sm")
@@ -3835,29 +4071,28 @@ with tab_ops:
                 use_container_width=True,
                 disabled=["Product Name"],
                 hide_index=True,
+                key="lss_stock_editor",
             )
             if st.button("💾 Update Stock", use_container_width=True, type="primary", key="update_stock"):
-                df_status.update(edited_df)
-                for item in df_status["Product Name"]:
-                    df_status = recalculate_item(df_status, item)
-                save_to_sheet(df_status, "persistent_inventory")
-                st.cache_data.clear()
+                # edited_rows holds {row position: {column: value}} for just the rows the user touched
+                _edited_pos = sorted(int(p) for p in st.session_state.lss_stock_editor.get("edited_rows", {}))
+                if _edited_pos:
+                    _changed = df_status.iloc[_edited_pos].copy()
+                    _changed.update(edited_df.iloc[_edited_pos])
+                    save_to_sheet(recalculate_all(_changed), "persistent_inventory")
                 st.rerun()
 
         sc1, sc2 = st.columns(2)
         with sc1:
-            buf = io.BytesIO()
-            with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
-                _exp_df = df_status[disp_cols].copy()
-                _total_row = {c: "" for c in disp_cols}
-                _total_row["Price"] = "Total ="
-                try:
-                    _total_row["Total Amount"] = round(pd.to_numeric(_exp_df["Total Amount"], errors="coerce").fillna(0).sum(), 2)
-                except Exception:
-                    _total_row["Total Amount"] = 0.0
-                _exp_df = pd.concat([_exp_df, pd.DataFrame([_total_row])], ignore_index=True)
-                _exp_df.to_excel(writer, index=False, sheet_name="Summary")
-            st.download_button("📥 Summary", data=buf.getvalue(), file_name="Summary.xlsx", use_container_width=True, key="dl_summary")
+            _exp_df = df_status[disp_cols].copy()
+            _total_row = {c: "" for c in disp_cols}
+            _total_row["Price"] = "Total ="
+            try:
+                _total_row["Total Amount"] = round(pd.to_numeric(_exp_df["Total Amount"], errors="coerce").fillna(0).sum(), 2)
+            except Exception:
+                _total_row["Total Amount"] = 0.0
+            _exp_df = pd.concat([_exp_df, pd.DataFrame([_total_row])], ignore_index=True)
+            st.download_button("📥 Summary", data=_to_excel_bytes({"Summary": _exp_df}), file_name="Summary.xlsx", use_container_width=True, key="dl_summary")
         with sc2:
             day_cols = [str(i) for i in range(1, 32)]
             existing_day_cols = [col for col in day_cols if col in df_status.columns]
@@ -3873,20 +4108,17 @@ with tab_ops:
             full_cols = [col for col in full_cols if col in df_status.columns]
 
             if full_cols:
-                buf_f = io.BytesIO()
-                with pd.ExcelWriter(buf_f, engine="xlsxwriter") as writer:
-                    _exp_full = df_status[full_cols].copy()
-                    _total_row_f = {c: "" for c in full_cols}
-                    if "Price" in full_cols:
-                        _total_row_f["Price"] = "Total ="
-                    if "Total Amount" in full_cols:
-                        try:
-                            _total_row_f["Total Amount"] = round(pd.to_numeric(_exp_full["Total Amount"], errors="coerce").fillna(0).sum(), 2)
-                        except Exception:
-                            _total_row_f["Total Amount"] = 0.0
-                    _exp_full = pd.concat([_exp_full, pd.DataFrame([_total_row_f])], ignore_index=True)
-                    _exp_full.to_excel(writer, index=False, sheet_name="Details")
-                st.download_button("📂 Details", data=buf_f.getvalue(), file_name="Full_Report.xlsx", use_container_width=True, key="dl_details")
+                _exp_full = df_status[full_cols].copy()
+                _total_row_f = {c: "" for c in full_cols}
+                if "Price" in full_cols:
+                    _total_row_f["Price"] = "Total ="
+                if "Total Amount" in full_cols:
+                    try:
+                        _total_row_f["Total Amount"] = round(pd.to_numeric(_exp_full["Total Amount"], errors="coerce").fillna(0).sum(), 2)
+                    except Exception:
+                        _total_row_f["Total Amount"] = 0.0
+                _exp_full = pd.concat([_exp_full, pd.DataFrame([_total_row_f])], ignore_index=True)
+                st.download_button("📂 Details", data=_to_excel_bytes_streamed(_exp_full, "Details"), file_name="Full_Report.xlsx", use_container_width=True, key="dl_details")
             else:
                 st.warning("⚠️ No data columns available for export")
 
@@ -3898,7 +4130,7 @@ with tab_ops:
         )
         _reqs = _prepare_reqs(_raw_reqs) if not _raw_reqs.empty else pd.DataFrame()
         if not _reqs.empty:
-            _reqs = _reqs[_reqs["Status"].isin(["Dispatched", "Completed"])].copy()
+            _reqs = _reqs[_reqs["_is_disp"]].copy()
             _reqs["_ts"] = pd.to_datetime(_reqs["Timestamp"], errors="coerce", utc=True)
             _reqs["_ts"] = _reqs["_ts"].dt.tz_localize(None)
             _reqs = _reqs.dropna(subset=["_ts"])
@@ -3933,7 +4165,7 @@ with tab_req:
         st.markdown('<span class="section-title">🚚 Restaurant Requisitions</span>', unsafe_allow_html=True)
     with _rq_refresh:
         if st.button("🔄", key="refresh_reqs", help="Refresh"):
-            st.cache_data.clear()
+            _load_table.clear()
             st.rerun()
 
     all_reqs = load_from_sheet(
@@ -4014,14 +4246,11 @@ with tab_sup:
             add_supplier_modal()
 
     with col_btn2:
-        meta_df = load_from_sheet("product_metadata")
-        if not meta_df.empty and "Supplier" in meta_df.columns:
-            all_suppliers = meta_df["Supplier"].dropna().unique().tolist()
-            suppliers_list = sorted([s for s in all_suppliers if s and str(s).strip()])
-            if suppliers_list:
-                selected_supplier = st.selectbox("Select Supplier", suppliers_list, label_visibility="collapsed", key="upd_supp_select")
-                if st.button("✏️ Update", use_container_width=True, key="btn_upd_supp"):
-                    update_supplier_modal(selected_supplier)
+        suppliers_list, _ = _supplier_directory(load_from_sheet("product_metadata", columns=_SUPPLIER_FIELDS))
+        if suppliers_list:
+            selected_supplier = st.selectbox("Select Supplier", suppliers_list, label_visibility="collapsed", key="upd_supp_select")
+            if st.button("✏️ Update", use_container_width=True, key="btn_upd_supp"):
+                update_supplier_modal(selected_supplier)
 
     st.divider()
 
@@ -4029,15 +4258,11 @@ with tab_sup:
     search = st.text_input("🔍 Filter...", placeholder="Item or Supplier...", key="sup_search")
 
     if not meta.empty:
-        filtered = meta[
-            ~meta["Product Name"].str.startswith("CATEGORY_", na=False)
-            & ~meta["Product Name"].str.startswith("SUPPLIER_", na=False)
-        ]
+        # Rows and lower-cased keys are cached per directory content; a keystroke only
+        # pays for one literal contains()
+        filtered, _keys = _supplier_search_rows(meta)
         if search:
-            filtered = filtered[
-                filtered["Product Name"].str.lower().str.contains(search.lower(), na=False)
-                | filtered["Supplier"].str.lower().str.contains(search.lower(), na=False)
-            ]
+            filtered = filtered[_keys.str.contains(search.lower(), na=False, regex=False)]
     else:
         filtered = meta
 
@@ -4063,7 +4288,12 @@ with tab_sup:
 
     edited_meta = st.data_editor(filtered_display, num_rows="dynamic", use_container_width=True, hide_index=True, height=400, key="sup_editor")
     if st.button("💾 Save Directory", use_container_width=True, type="primary", key="save_sup_dir"):
-        save_to_sheet(edited_meta, "product_metadata")
+        # Upsert only rows that were added or differ from what was shown (NaN == NaN counts as unchanged)
+        _shown = filtered_display.reindex(edited_meta.index)
+        _same = (edited_meta.eq(_shown) | (edited_meta.isna() & _shown.isna())).all(axis=1)
+        _dirty = edited_meta[~_same]
+        if not _dirty.empty:
+            save_to_sheet(_dirty, "product_metadata")
         st.rerun()
 
 # ===================== DASHBOARD TAB =====================
@@ -4103,7 +4333,7 @@ with tab_dash:
         end_date = st.date_input("To", value=today, key="dash_end", label_visibility="collapsed")
     with d4:
         if st.button("🔄 Refresh", use_container_width=True, key="dash_refresh"):
-            st.cache_data.clear()
+            _load_table.clear()
             st.rerun()
     with d5:
         # Export button placeholder — actual download button rendered after data is computed below
@@ -4118,13 +4348,13 @@ with tab_dash:
 
         # Data
         inv_df = _prepare_inventory(load_from_sheet("persistent_inventory"))
-        meta_df = _prepare_metadata()
+        meta_df = _prepare_metadata(load_from_sheet("product_metadata"))
         req_df = _prepare_reqs(load_from_sheet("restaurant_requisitions"))
         log_df = _prepare_logs(load_from_sheet("activity_logs"))
 
         meta_cur = _currency_filtered_meta(meta_df, currency_choice)
 
-        meta_all = meta_df.copy() if meta_df is not None else pd.DataFrame()
+        meta_all = meta_df if meta_df is not None else pd.DataFrame()
         if meta_all is None or meta_all.empty:
             meta_all = pd.DataFrame(columns=["Product Name", "UOM", "Category", "Price", "Currency", "Supplier"])
 
@@ -4159,12 +4389,18 @@ with tab_dash:
             inv_join.loc[inv_join["Category"] == "", "Category"] = inv_join["Category_x"].fillna("General").astype(str).str.strip()
             inv_join = inv_join.drop(columns=["Category_x", "Category_y"])
 
-        inv_join["Price"] = pd.to_numeric(inv_join.get("Price", 0), errors="coerce").fillna(0.0)
-        inv_join["Closing Stock"] = pd.to_numeric(inv_join.get("Closing Stock", 0), errors="coerce").fillna(0.0)
-        inv_join["Stock Value"] = (inv_join["Closing Stock"] * inv_join["Price"]).round(2)
+        # Closing Stock/Price are float64 from the _prepare_* helpers; only fill the join's NaN prices
+        inv_join["Price"] = inv_join["Price"].fillna(0.0).astype("float64")
+        _cs = inv_join["Closing Stock"].to_numpy(dtype="float64")
+        _pr = inv_join["Price"].to_numpy(dtype="float64")
+        inv_join["Stock Value"] = np.round(_cs * _pr, 2)
+
+        # Half-open [start, end + 1 day) window; NaT rows compare False and drop out
+        _start_ts = pd.Timestamp(start_date)
+        _end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
 
         # Requisitions filter
-        req_filtered = req_df.copy() if req_df is not None and not req_df.empty else pd.DataFrame(
+        req_filtered = req_df if req_df is not None and not req_df.empty else pd.DataFrame(
             columns=["Restaurant", "Item", "Qty", "DispatchQty", "Status", "RequestedDate", "DispatchTS_Date"]
         )
         if not req_filtered.empty:
@@ -4172,26 +4408,41 @@ with tab_dash:
                 req_filtered = req_filtered[req_filtered["Restaurant"] == restaurant_filter]
 
             date_col = "DispatchTS_Date" if dispatch_date_basis == "Dispatch Timestamp" else "RequestedDate"
-            req_filtered = req_filtered[req_filtered[date_col].notna()]
-            req_filtered = req_filtered[(req_filtered[date_col] >= start_date) & (req_filtered[date_col] <= end_date)]
+            req_filtered = req_filtered[(req_filtered[date_col] >= _start_ts) & (req_filtered[date_col] < _end_ts)]
 
         # Logs filter (Received)
-        logs_filtered = log_df.copy() if log_df is not None and not log_df.empty else pd.DataFrame(columns=["Item", "Qty", "Status", "LogDateParsed"])
+        logs_filtered = log_df if log_df is not None and not log_df.empty else pd.DataFrame(columns=["Item", "Qty", "Status", "LogDateParsed"])
         if not logs_filtered.empty:
             logs_filtered = logs_filtered[logs_filtered["Status"] == "Active"]
-            logs_filtered = logs_filtered[logs_filtered["LogDateParsed"].notna()]
             logs_filtered = logs_filtered[
-                (logs_filtered["LogDateParsed"] >= start_date) & (logs_filtered["LogDateParsed"] <= end_date)
+                (logs_filtered["LogDateParsed"] >= _start_ts) & (logs_filtered["LogDateParsed"] < _end_ts)
             ]
 
-        total_ordered_qty = float(req_filtered["Qty"].sum()) if not req_filtered.empty else 0.0
-        total_dispatched_qty = (
-            float(req_filtered[req_filtered["Status"].isin(["Dispatched", "Completed"])]["DispatchQty"].sum()) if not req_filtered.empty else 0.0
+        # One logs × metadata join and one groupby per key feed every receipts-based card
+        _has_meta = meta_df is not None and not meta_df.empty
+        logs_joined = _join_logs_with_meta(logs_filtered, meta_df)
+        recv_by_item = logs_joined.groupby("Item", as_index=False).agg(
+            **{"Received Qty": ("Qty", "sum"), "Purchase Value": ("Value", "sum")}
+        )
+        recv_by_supplier = logs_joined.groupby("Supplier", as_index=False).agg(
+            Qty=("Qty", "sum"), **{"Purchase Amount": ("Value", "sum")}
         )
+
+        # Same for dispatches: one groupby feeds both Top Selling cards and the KPI total
+        disp_reqs = req_filtered[req_filtered["_is_disp"]] if not req_filtered.empty else pd.DataFrame(columns=["Item", "DispatchQty"])
+        sold_by_item = disp_reqs.groupby("Item", as_index=False).agg(**{"Dispatched Qty": ("DispatchQty", "sum")})
+        sold_by_item["Sales Value"] = 0.0
+        if _has_meta and not sold_by_item.empty:
+            _price = meta_df.drop_duplicates("Product Name").set_index("Product Name")["Price"]
+            _price = sold_by_item["Item"].map(_price).fillna(0.0)
+            sold_by_item["Sales Value"] = sold_by_item["Dispatched Qty"].to_numpy() * _price.to_numpy()
+
+        total_ordered_qty = float(req_filtered["Qty"].sum()) if not req_filtered.empty else 0.0
+        total_dispatched_qty = float(sold_by_item["Dispatched Qty"].sum())
         total_received_qty = float(logs_filtered["Qty"].sum()) if not logs_filtered.empty else 0.0
 
-        stock_inhand_qty = float(inv_join["Closing Stock"].sum()) if not inv_join.empty else 0.0
-        stock_inhand_value = float(inv_join["Stock Value"].sum()) if not inv_join.empty else 0.0
+        stock_inhand_qty = float(_cs.sum())
+        stock_inhand_value = float(_cs @ _pr)
 
         # --- Dashboard layout: flat 3-column grid ---
         col1, col2, col3 = st.columns([1, 1, 1.2])
@@ -4207,15 +4458,11 @@ with tab_dash:
                 chart_type = s.get("chart_type", "Pie Chart")
                 label_mode = s.get("label_mode", "%")
 
-                purchased_qty = pd.DataFrame(columns=["Item", "Received Qty"])
-                if not logs_filtered.empty:
-                    purchased_qty = (
-                        logs_filtered.groupby("Item", as_index=False)["Qty"]
-                        .sum()
-                        .rename(columns={"Qty": "Received Qty"})
-                        .sort_values("Received Qty", ascending=asc)
-                        .head(topn)
-                    )
+                purchased_qty = (
+                    recv_by_item[["Item", "Received Qty"]]
+                    .sort_values("Received Qty", ascending=asc)
+                    .head(topn)
+                )
 
                 if label_mode == "Amount":
                     purchased_qty = _add_amount_col(purchased_qty, "Item", "Received Qty", meta_df)
@@ -4242,29 +4489,16 @@ with tab_dash:
                 label_mode = s.get("label_mode", "%")
 
                 purchased_val = pd.DataFrame(columns=["Item", "Purchase Value"])
-                if not logs_filtered.empty and meta_df is not None and not meta_df.empty:
-                    tmp = pd.merge(
-                        logs_filtered.rename(columns={"Item": "Product Name"})[["Product Name", "Qty"]],
-                        meta_df[["Product Name", "Price"]],
-                        on="Product Name",
-                        how="left",
-                    )
-                    tmp["Qty"] = pd.to_numeric(tmp["Qty"], errors="coerce").fillna(0.0)
-                    tmp["Price"] = pd.to_numeric(tmp["Price"], errors="coerce").fillna(0.0)
-                    tmp["Purchase Value"] = tmp["Qty"] * tmp["Price"]
+                if not logs_filtered.empty and _has_meta:
                     purchased_val = (
-                        tmp.groupby("Product Name", as_index=False)["Purchase Value"]
-                        .sum()
-                        .rename(columns={"Product Name": "Item"})
+                        recv_by_item[["Item", "Purchase Value"]]
                         .sort_values("Purchase Value", ascending=asc)
                         .head(topn)
                     )
 
                 if label_mode == "Qty" and not logs_filtered.empty:
                     _pv_display = (
-                        logs_filtered.groupby("Item", as_index=False)["Qty"]
-                        .sum()
-                        .rename(columns={"Qty": "Received Qty"})
+                        recv_by_item[["Item", "Received Qty"]]
                         .sort_values("Received Qty", ascending=asc)
                         .head(topn)
                     )
@@ -4293,16 +4527,11 @@ with tab_dash:
                 chart_type = s.get("chart_type", "Pie Chart")
                 label_mode = s.get("label_mode", "%")
 
-                selling_qty = pd.DataFrame(columns=["Item", "Dispatched Qty"])
-                if not req_filtered.empty:
-                    disp_only = req_filtered[req_filtered["Status"].isin(["Dispatched", "Completed"])]
-                    selling_qty = (
-                        disp_only.groupby("Item", as_index=False)["DispatchQty"]
-                        .sum()
-                        .rename(columns={"DispatchQty": "Dispatched Qty"})
-                        .sort_values("Dispatched Qty", ascending=asc)
-                        .head(topn)
-                    )
+                selling_qty = (
+                    sold_by_item[["Item", "Dispatched Qty"]]
+                    .sort_values("Dispatched Qty", ascending=asc)
+                    .head(topn)
+                )
 
                 if label_mode == "Amount":
                     selling_qty = _add_amount_col(selling_qty, "Item", "Dispatched Qty", meta_df)
@@ -4329,32 +4558,16 @@ with tab_dash:
                 label_mode = s.get("label_mode", "%")
 
                 selling_val = pd.DataFrame(columns=["Item", "Sales Value"])
-                if not req_filtered.empty and meta_df is not None and not meta_df.empty:
-                    disp_only = req_filtered[req_filtered["Status"].isin(["Dispatched", "Completed"])][["Item", "DispatchQty"]].copy()
-                    disp_only["DispatchQty"] = pd.to_numeric(disp_only["DispatchQty"], errors="coerce").fillna(0.0)
-
-                    tmp = pd.merge(
-                        disp_only.rename(columns={"Item": "Product Name"}),
-                        meta_df[["Product Name", "Price"]],
-                        on="Product Name",
-                        how="left",
-                    )
-                    tmp["Price"] = pd.to_numeric(tmp["Price"], errors="coerce").fillna(0.0)
-                    tmp["Sales Value"] = tmp["DispatchQty"] * tmp["Price"]
+                if not req_filtered.empty and _has_meta:
                     selling_val = (
-                        tmp.groupby("Product Name", as_index=False)["Sales Value"]
-                        .sum()
-                        .rename(columns={"Product Name": "Item"})
+                        sold_by_item[["Item", "Sales Value"]]
                         .sort_values("Sales Value", ascending=asc)
                         .head(topn)
                     )
 
                 if label_mode == "Qty" and not req_filtered.empty:
-                    disp_only_qty = req_filtered[req_filtered["Status"].isin(["Dispatched", "Completed"])][["Item", "DispatchQty"]].copy()
                     _sv_display = (
-                        disp_only_qty.groupby("Item", as_index=False)["DispatchQty"]
-                        .sum()
-                        .rename(columns={"DispatchQty": "Dispatched Qty"})
+                        sold_by_item[["Item", "Dispatched Qty"]]
                         .sort_values("Dispatched Qty", ascending=asc)
                         .head(topn)
                     )
@@ -4377,7 +4590,7 @@ with tab_dash:
             # --- Compute KPI values ---
             purchase_total_val = float(purchased_val["Purchase Value"].sum()) if not purchased_val.empty else 0.0
             if purchase_total_val == 0.0 and meta_df is not None:
-                purchase_total_val = float(_sum_purchase_from_logs(logs_filtered, meta_df)["Purchase Amount"].sum())
+                purchase_total_val = float(recv_by_supplier["Purchase Amount"].sum())
             sales_total_val = float(selling_val["Sales Value"].sum()) if not selling_val.empty else 0.0
             pnl = sales_total_val - purchase_total_val
             pnl_value_class = "good" if pnl >= 0 else "bad"
@@ -4428,21 +4641,17 @@ with tab_dash:
                 chart_type = s.get("chart_type", "Pie Chart")
                 label_mode = s.get("label_mode", "%")
 
-                supplier_df = _sum_purchase_from_logs(logs_filtered, meta_df)
-                if not supplier_df.empty:
-                    supplier_df = supplier_df.sort_values("Purchase Amount", ascending=asc).head(topn)
-
-                if label_mode == "Qty" and not logs_filtered.empty and meta_df is not None and not meta_df.empty:
-                    _supp_qty = pd.merge(
-                        logs_filtered.rename(columns={"Item": "Product Name"})[["Product Name", "Qty"]],
-                        meta_df[["Product Name", "Supplier"]],
-                        on="Product Name",
-                        how="left",
+                supplier_df = pd.DataFrame(columns=["Supplier", "Purchase Amount"])
+                if _has_meta:
+                    supplier_df = (
+                        recv_by_supplier[["Supplier", "Purchase Amount"]]
+                        .sort_values("Purchase Amount", ascending=asc)
+                        .head(topn)
                     )
-                    _supp_qty["Supplier"] = _supp_qty["Supplier"].fillna("Unknown").astype(str).str.strip().replace("", "Unknown")
+
+                if label_mode == "Qty" and not logs_filtered.empty and _has_meta:
                     _supp_display = (
-                        _supp_qty.groupby("Supplier", as_index=False)["Qty"]
-                        .sum()
+                        recv_by_supplier[["Supplier", "Qty"]]
                         .sort_values("Qty", ascending=asc)
                         .head(topn)
                     )
@@ -4556,7 +4765,7 @@ with tab_restaurants:
                     _inv_code = _result["invite_code"]["code"]
                     st.success(f"✅ Restaurant **{r_name.strip()}** created!")
                     st.info(f"📋 Invite Code: **{_inv_code}** — Share this with the restaurant manager(s)")
-                    st.cache_data.clear()
+                    _load_table.clear()
                     st.rerun()
                 else:
                     st.error("❌ Failed to create restaurant. Please try again.")
@@ -4567,7 +4776,7 @@ with tab_restaurants:
     st.markdown('<span class="section-title">🏪 Your Restaurants</span>', unsafe_allow_html=True)
 
     if st.button("🔄 Refresh List", key="refresh_rest_list"):
-        st.cache_data.clear()
+        _load_table.clear()
         st.rerun()
 
     _restaurants = get_org_restaurants(_mgr_org_id)
@@ -4684,7 +4893,7 @@ with tab_restaurants:
                                 _hold_new_role  = "held"
                             if st.button(_hold_btn_label, key=f"hold_{_mem_id}_{_lid}", use_container_width=True):
                                 if update_member_role(_mem_id, _hold_new_role):
-                                    st.cache_data.clear()
+                                    _load_table.clear()
                                     st.rerun()
                                 else:
                                     st.error("❌ Failed to update access.")
@@ -4698,7 +4907,7 @@ with tab_restaurants:
                                 _ro_new_role  = "read_only"
                             if st.button(_ro_btn_label, key=f"ro_{_mem_id}_{_lid}", use_container_width=True):
                                 if update_member_role(_mem_id, _ro_new_role):
-                                    st.cache_data.clear()
+                                    _load_table.clear()
                                     st.rerun()
                                 else:
                                     st.error("❌ Failed to update access.")
@@ -4706,7 +4915,7 @@ with tab_restaurants:
                             if st.button("🗑️ Remove", key=f"del_{_mem_id}_{_lid}", use_container_width=True):
                                 if delete_membership(_mem_id):
                                     st.warning(f"🗑️ Access removed for **{_mem_email}**")
-                                    st.cache_data.clear()
+                                    _load_table.clear()
                                     st.rerun()
                                 else:
                                     st.error("❌ Failed to remove access.")
@@ -4750,7 +4959,7 @@ with tab_restaurants:
                                         f"✅ New invite code: **{_new_code['code']}** · "
                                         f"Valid for 30 minutes · Single use only"
                                     )
-                                    st.cache_data.clear()
+                                    _load_table.clear()
                                     st.rerun()
                                 else:
                                     st.error("❌ Failed to generate code.")
@@ -4764,7 +4973,7 @@ with tab_restaurants:
                         if st.button("🔒 Deactivate", key=f"deact_{_lid}", use_container_width=True):
                             if deactivate_restaurant(_lid):
                                 st.warning(f"🔒 **{_lname}** deactivated.")
-                                st.cache_data.clear()
+                                _load_table.clear()
                                 st.rerun()
                             else:
                                 st.error("❌ Failed to deactivate.")
@@ -4772,7 +4981,7 @@ with tab_restaurants:
                         if st.button("🔓 Reactivate", key=f"react_{_lid}", use_container_width=True):
                             if reactivate_restaurant(_lid):
                                 st.success(f"🔓 **{_lname}** reactivated.")
-                                st.cache_data.clear()
+                                _load_table.clear()
                                 st.rerun()
                             else:
                                 st.error("❌ Failed to reactivate.")
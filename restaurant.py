@@ -287,24 +287,32 @@ def save_to_sheet(df, table_name):
 
 def create_standard_inventory(df):
     """Convert uploaded inventory to standard format with all required columns"""
-    standard_df = pd.DataFrame()
+    n = len(df)
+    day_cols = [str(day) for day in range(1, 32)]
     
     # Map columns or use defaults
-    standard_df["Product Name"] = df[1] if 1 in df.columns else ""
-    standard_df["Category"] = "General"
-    standard_df["UOM"] = df[2] if 2 in df.columns else "pcs"
-    standard_df["Opening Stock"] = pd.to_numeric(df[3] if 3 in df.columns else 0, errors='coerce').fillna(0)
+    opening = pd.to_numeric(df[3], errors='coerce').fillna(0).to_numpy(dtype="float64") if 3 in df.columns else np.zeros(n)
     
-    # Add day columns (1-31)
-    for day in range(1, 32):
-        standard_df[str(day)] = 0.0
-    
-    # Add calculation columns
-    standard_df["Total Received"] = 0.0
-    standard_df["Consumption"] = 0.0
-    standard_df["Closing Stock"] = standard_df["Opening Stock"]
-    standard_df["Physical Count"] = None
-    standard_df["Variance"] = 0.0
+    # Build every column in one constructor; the day matrix is a single zeroed block
+    standard_df = pd.concat(
+        [
+            pd.DataFrame({
+                "Product Name": df[1].to_numpy() if 1 in df.columns else "",
+                "Category": "General",
+                "UOM": df[2].to_numpy() if 2 in df.columns else "pcs",
+                "Opening Stock": opening,
+            }, index=range(n)),
+            pd.DataFrame(np.zeros((n, len(day_cols))), columns=day_cols),
+            pd.DataFrame({
+                "Total Received": 0.0,
+                "Consumption": 0.0,
+                "Closing Stock": opening,
+                "Physical Count": None,
+                "Variance": 0.0,
+            }, index=range(n)),
+        ],
+        axis=1,
+    )
     
     # Remove empty rows
     standard_df = standard_df.dropna(subset=["Product Name"])
@@ -313,43 +321,30 @@ def create_standard_inventory(df):
     
     return standard_df
 
+def _rows_by_name(df, names):
+    """Pair each position in names with the index label of that product's first row in df (hash lookups, no per-name mask scan)"""
+    first = df.drop_duplicates(subset="Product Name")
+    row_of = dict(zip(first["Product Name"], first.index))
+    return [(i, row_of[n]) for i, n in enumerate(names) if n in row_of]
+
 def recalculate_inventory(df):
     """Recalculate totals and closing stock"""
-    day_cols = [str(i) for i in range(1, 32)]
+    day_cols = [c for c in (str(i) for i in range(1, 32)) if c in df.columns]
     
-    # Ensure all day columns are numeric
-    for col in day_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+    # Coerce the day columns in one pass and sum them row-wise
+    df[day_cols] = df[day_cols].apply(pd.to_numeric, errors='coerce').fillna(0.0)
+    df["Total Received"] = df[day_cols].to_numpy(dtype="float64").sum(axis=1)
     
     # Ensure Opening Stock and Consumption are numeric
     df["Opening Stock"] = pd.to_numeric(df["Opening Stock"], errors='coerce').fillna(0.0)
     df["Consumption"] = pd.to_numeric(df["Consumption"], errors='coerce').fillna(0.0)
     
-    for idx, row in df.iterrows():
-        # Calculate total received from day columns
-        total_received = 0.0
-        for col in day_cols:
-            if col in df.columns:
-                total_received += float(df.at[idx, col]) if pd.notna(df.at[idx, col]) else 0.0
-        
-        df.at[idx, "Total Received"] = total_received
-        
-        # Calculate closing stock: Opening + Received - Consumption
-        opening = float(df.at[idx, "Opening Stock"]) if pd.notna(df.at[idx, "Opening Stock"]) else 0.0
-        consumption = float(df.at[idx, "Consumption"]) if pd.notna(df.at[idx, "Consumption"]) else 0.0
-        df.at[idx, "Closing Stock"] = opening + total_received - consumption
-        
-        # Calculate variance
-        physical = df.at[idx, "Physical Count"]
-        if pd.notna(physical) and str(physical).strip() != "":
-            try:
-                physical_val = float(physical)
-                df.at[idx, "Variance"] = physical_val - df.at[idx, "Closing Stock"]
-            except:
-                df.at[idx, "Variance"] = 0.0
-        else:
-            df.at[idx, "Variance"] = 0.0
+    # Calculate closing stock: Opening + Received - Consumption
+    df["Closing Stock"] = df["Opening Stock"] + df["Total Received"] - df["Consumption"]
+    
+    # Variance only where a usable physical count was entered
+    physical = pd.to_numeric(df["Physical Count"], errors='coerce')
+    df["Variance"] = (physical - df["Closing Stock"]).fillna(0.0)
     
     return df
 
@@ -560,11 +555,12 @@ def _rest_close_month_modal():
     with mc1:
         if st.button("✅ Confirm Close Month", type="primary", use_container_width=True, key="rest_close_month_confirm"):
             df = st.session_state.inventory.copy()
-            for _, prow in edited_close.iterrows():
-                pname = prow["Product Name"]
-                match = df[df["Product Name"] == pname].index
-                if len(match) > 0:
-                    df.at[match[0], "Physical Count"] = float(prow["Physical Count"])
+            _pairs = _rows_by_name(df, edited_close["Product Name"])
+            if _pairs:
+                _src, _dst = zip(*_pairs)
+                df.loc[list(_dst), "Physical Count"] = pd.to_numeric(
+                    edited_close["Physical Count"].iloc[list(_src)], errors="coerce"
+                ).to_numpy()
             df["Physical Count"] = pd.to_numeric(df["Physical Count"], errors="coerce").fillna(0.0)
             df["Closing Stock"]  = pd.to_numeric(df["Closing Stock"],  errors="coerce").fillna(0.0)
             df["Variance"]       = df["Physical Count"] - df["Closing Stock"]
@@ -1476,34 +1472,38 @@ def _build_inventory_from_catalogue() -> pd.DataFrame:
     # 2. Load existing restaurant inventory (has day columns + consumption etc.)
     existing = load_from_sheet("rest_01_inventory")
 
-    # 3. Build base inventory from catalogue
+    # 3. Build base inventory from catalogue (one constructor; days are one zeroed block)
     day_cols = [str(i) for i in range(1, 32)]
-    base = pd.DataFrame()
-    base["Product Name"] = cat_df["Product Name"]
-    base["Category"]     = cat_df.get("Category", pd.Series(["General"] * len(cat_df)))
-    base["UOM"]          = cat_df.get("UOM",      pd.Series(["pcs"]     * len(cat_df)))
-    base["Price"]        = pd.to_numeric(cat_df.get("Price", pd.Series([0.0] * len(cat_df))), errors="coerce").fillna(0.0)
-    for d in day_cols:
-        base[d] = 0.0
-    base["Opening Stock"]  = 0.0
-    base["Total Received"] = 0.0
-    base["Consumption"]    = 0.0
-    base["Closing Stock"]  = 0.0
-    base["Physical Count"] = None
-    base["Variance"]       = 0.0
-
-    # 4. Merge: overlay existing saved data onto the base
+    n = len(cat_df)
+    base = pd.concat(
+        [
+            pd.DataFrame({
+                "Product Name": cat_df["Product Name"],
+                "Category":     cat_df.get("Category", pd.Series(["General"] * n)),
+                "UOM":          cat_df.get("UOM",      pd.Series(["pcs"]     * n)),
+                "Price":        pd.to_numeric(cat_df.get("Price", pd.Series([0.0] * n)), errors="coerce").fillna(0.0),
+            }),
+            pd.DataFrame(np.zeros((n, len(day_cols))), columns=day_cols),
+            pd.DataFrame({
+                "Opening Stock":  0.0,
+                "Total Received": 0.0,
+                "Consumption":    0.0,
+                "Closing Stock":  0.0,
+                "Physical Count": None,
+                "Variance":       0.0,
+            }, index=range(n)),
+        ],
+        axis=1,
+    )
+
+    # 4. Merge: overlay existing saved data onto the base, aligned by Product Name.
+    # Blank saved cells keep the base default (the same value recalculation would give them).
     if not existing.empty and "Product Name" in existing.columns:
-        existing = existing.set_index("Product Name")
-        for i, row in base.iterrows():
-            pname = row["Product Name"]
-            if pname in existing.index:
-                ex = existing.loc[pname]
-                # Restore saved numeric columns
-                for col in day_cols + ["Opening Stock", "Total Received", "Consumption",
-                                       "Closing Stock", "Physical Count", "Variance"]:
-                    if col in existing.columns:
-                        base.at[i, col] = ex[col]
+        existing = existing.drop_duplicates(subset="Product Name").set_index("Product Name")
+        restore = [col for col in day_cols + ["Opening Stock", "Total Received", "Consumption",
+                                              "Closing Stock", "Physical Count", "Variance"]
+                   if col in existing.columns]
+        base.update(existing[restore].reindex(base["Product Name"]).set_axis(base.index))
 
     base = base.fillna({d: 0.0 for d in day_cols})
     base = base.reset_index(drop=True)
@@ -1722,15 +1722,15 @@ with tab_inv:
             if _rest_read_only:
                 st.warning("🔒 Read-only mode — saving is disabled.")
             elif st.button("💾 Save Daily Count", type="primary", use_container_width=True, key="save_inv"):
-                for col in edited_inv.columns:
-                    if col not in ["Product Name", "Category", "UOM", "Opening Stock", "Total Received", "Closing Stock", "Variance"]:
-                        for edited_idx in edited_inv.index:
-                            # Map back to main inventory via Product Name
-                            pname = edited_inv.at[edited_idx, "Product Name"] if "Product Name" in edited_inv.columns else None
-                            if pname is not None:
-                                main_idx = st.session_state.inventory[st.session_state.inventory["Product Name"] == pname].index
-                                if len(main_idx) > 0:
-                                    st.session_state.inventory.at[main_idx[0], col] = edited_inv.at[edited_idx, col]
+                # Map edited rows back to the main inventory via Product Name, then copy each column in one write
+                _edit_cols = [col for col in edited_inv.columns
+                              if col not in ["Product Name", "Category", "UOM", "Opening Stock", "Total Received", "Closing Stock", "Variance"]]
+                if "Product Name" in edited_inv.columns:
+                    _pairs = _rows_by_name(st.session_state.inventory, edited_inv["Product Name"])
+                    if _pairs:
+                        _src, _dst = (list(p) for p in zip(*_pairs))
+                        for col in _edit_cols:
+                            st.session_state.inventory.loc[_dst, col] = edited_inv[col].iloc[_src].to_numpy()
 
                 st.session_state.inventory = recalculate_inventory(st.session_state.inventory)
                 if save_to_sheet(st.session_state.inventory, "rest_01_inventory"):
@@ -1847,12 +1847,11 @@ with tab_req:
                 col2.warning("🔒 Read-only — cannot submit.")
             elif col2.button("🚀 Submit", type="primary", use_container_width=True, key="submit_req"):
                 try:
-                    all_reqs = load_from_sheet("restaurant_requisitions", ["ReqID", "Restaurant", "Item", "Qty", "Status", "DispatchQty", "AcceptedQty", "Timestamp", "RequestedDate", "FollowupSent"])
-                    
                     st.info(f"📤 Sending {len(st.session_state.cart)} items...")
                     
-                    for item in st.session_state.cart:
-                        new_req = pd.DataFrame([{
+                    _now = datetime.datetime.now()
+                    new_reqs = [
+                        {
                             "ReqID": str(uuid.uuid4())[:8],
                             "Restaurant": st.session_state.get("restaurant_name", "Unknown Restaurant"),
                             "Item": item['name'],
@@ -1860,21 +1859,21 @@ with tab_req:
                             "Status": "Pending",
                             "DispatchQty": 0.0,
                             "AcceptedQty": 0.0,
-                            "Timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "RequestedDate": datetime.datetime.now().strftime("%Y-%m-%d"),
+                            "Timestamp": _now.strftime("%Y-%m-%d %H:%M:%S"),
+                            "RequestedDate": _now.strftime("%Y-%m-%d"),
                             "FollowupSent": False,
                             "submitted_by": st.session_state.get("user_id"),
                             "submitted_by_email": st.session_state.get("user_email", ""),
-                        }])
-                        all_reqs = pd.concat([all_reqs, new_req], ignore_index=True)
-                    
-                    st.write(f"✅ Total records to save: {len(all_reqs)}")
+                        }
+                        for item in st.session_state.cart
+                    ]
+                    # Upsert only the new rows (fresh ReqIDs, so this is an append); existing
+                    # requisitions are left exactly as the warehouse last wrote them
+                    new_reqs_df = pd.DataFrame(new_reqs)
                     
-                    all_reqs["Qty"] = pd.to_numeric(all_reqs["Qty"], errors='coerce')
-                    all_reqs["DispatchQty"] = pd.to_numeric(all_reqs["DispatchQty"], errors='coerce')
-                    all_reqs = all_reqs.reset_index(drop=True)
+                    st.write(f"✅ Total records to save: {len(new_reqs_df)}")
                     
-                    if save_to_sheet(all_reqs, "restaurant_requisitions"):
+                    if save_to_sheet(new_reqs_df, "restaurant_requisitions"):
                         st.success("✅ Requisition sent to Warehouse successfully!")
                         st.balloons()
                         st.session_state.cart = []
@@ -2204,30 +2203,26 @@ with tab_history:
                 for grp in unique_grps:
                     grp_hist = filtered_history[filtered_history["_grp"] == grp]
                     with st.expander(f"📅 {grp}  ·  {len(grp_hist)} item(s)", expanded=False):
-                        for _, row in grp_hist.iterrows():
-                            item_name    = row["Item"]
-                            req_qty      = float(row["Qty"])
-                            dispatch_qty = float(row["DispatchQty"])
-                            status       = row["Status"]
-                            remaining    = req_qty - dispatch_qty
-                            followup     = row.get("FollowupSent", False)
-                            date_str     = pd.Timestamp(row["RequestedDate"]).strftime("%d/%m")
-
-                            if status == "Pending":
-                                si = "🟡"
-                            elif status == "Dispatched":
-                                si = "🟠"
-                            else:
-                                si = "🟢"
-
-                            _fup = " ⚠️" if followup else ""
-                            st.markdown(
+                        # One markdown element per group instead of one per row
+                        _status = grp_hist["Status"]
+                        _si = np.select([_status == "Pending", _status == "Dispatched"], ["🟡", "🟠"], "🟢")
+                        _fups = (grp_hist["FollowupSent"].astype(bool) if "FollowupSent" in grp_hist.columns
+                                 else pd.Series(False, index=grp_hist.index))
+                        _rows = zip(
+                            _si, grp_hist["Item"], _fups,
+                            grp_hist["RequestedDate"].dt.strftime("%d/%m"),
+                            grp_hist["Qty"].astype(float), grp_hist["DispatchQty"].astype(float), _status,
+                        )
+                        st.markdown(
+                            "".join(
                                 f"<div style='font-size:12px;padding:3px 0;border-bottom:1px solid #F1F5F9;'>"
-                                f"{si} <b>{item_name}</b>{_fup} "
-                                f"<span style='color:#94A3B8;'>{date_str} · Req:{req_qty:.0f} Got:{dispatch_qty:.0f} Rem:{remaining:.0f} · {status}</span>"
-                                f"</div>",
-                                unsafe_allow_html=True,
-                            )
+                                f"{si} <b>{item_name}</b>{' ⚠️' if followup else ''} "
+                                f"<span style='color:#94A3B8;'>{date_str} · Req:{req_qty:.0f} Got:{dispatch_qty:.0f} Rem:{req_qty - dispatch_qty:.0f} · {status}</span>"
+                                f"</div>"
+                                for si, item_name, followup, date_str, req_qty, dispatch_qty, status in _rows
+                            ),
+                            unsafe_allow_html=True,
+                        )
             else:
                 st.info("📭 No records match your filters")
         else:
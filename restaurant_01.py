@@ -138,26 +138,47 @@ def save_to_sheet(df, table_name):
         st.error(f"❌ Database Save Error ({table_name}): {e}")
         return False
 
+def _read_upload(file, **kwargs):
+    """Read an uploaded .xlsx/.csv with calamine/pyarrow when installed, else pandas' default engines"""
+    return _parse_upload(file.getvalue(), file.name.endswith('.xlsx'), **kwargs)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_upload(data, is_xlsx, **kwargs):
+    """Parse uploaded bytes once; reruns while the uploader still holds the file hit the cache"""
+    reader = pd.read_excel if is_xlsx else pd.read_csv
+    try:
+        return reader(io.BytesIO(data), engine="calamine" if is_xlsx else "pyarrow", **kwargs)
+    except (ImportError, ValueError):
+        return reader(io.BytesIO(data), **kwargs)
+
 def create_standard_inventory(df):
     """Convert uploaded inventory to standard format with all required columns"""
-    standard_df = pd.DataFrame()
+    n = len(df)
+    day_cols = [str(day) for day in range(1, 32)]
     
     # Map columns or use defaults
-    standard_df["Product Name"] = df[1] if 1 in df.columns else ""
-    standard_df["Category"] = "General"
-    standard_df["UOM"] = df[2] if 2 in df.columns else "pcs"
-    standard_df["Opening Stock"] = pd.to_numeric(df[3] if 3 in df.columns else 0, errors='coerce').fillna(0)
-    
-    # Add day columns (1-31)
-    for day in range(1, 32):
-        standard_df[str(day)] = 0.0
+    opening = pd.to_numeric(df[3], errors='coerce').fillna(0).to_numpy(dtype="float64") if 3 in df.columns else np.zeros(n)
     
-    # Add calculation columns
-    standard_df["Total Received"] = 0.0
-    standard_df["Consumption"] = 0.0
-    standard_df["Closing Stock"] = standard_df["Opening Stock"]
-    standard_df["Physical Count"] = None
-    standard_df["Variance"] = 0.0
+    # Build every column in one constructor; the day matrix is a single zeroed block
+    standard_df = pd.concat(
+        [
+            pd.DataFrame({
+                "Product Name": df[1].to_numpy() if 1 in df.columns else "",
+                "Category": "General",
+                "UOM": df[2].to_numpy() if 2 in df.columns else "pcs",
+                "Opening Stock": opening,
+            }, index=range(n)),
+            pd.DataFrame(np.zeros((n, len(day_cols))), columns=day_cols),
+            pd.DataFrame({
+                "Total Received": 0.0,
+                "Consumption": 0.0,
+                "Closing Stock": opening,
+                "Physical Count": None,
+                "Variance": 0.0,
+            }, index=range(n)),
+        ],
+        axis=1,
+    )
     
     # Remove empty rows
     standard_df = standard_df.dropna(subset=["Product Name"])
@@ -168,41 +189,22 @@ def create_standard_inventory(df):
 
 def recalculate_inventory(df):
     """Recalculate totals and closing stock"""
-    day_cols = [str(i) for i in range(1, 32)]
+    day_cols = [c for c in (str(i) for i in range(1, 32)) if c in df.columns]
     
-    # Ensure all day columns are numeric
-    for col in day_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+    # Coerce the day columns in one pass and sum them row-wise
+    df[day_cols] = df[day_cols].apply(pd.to_numeric, errors='coerce').fillna(0.0)
+    df["Total Received"] = df[day_cols].to_numpy(dtype="float64").sum(axis=1)
     
     # Ensure Opening Stock and Consumption are numeric
     df["Opening Stock"] = pd.to_numeric(df["Opening Stock"], errors='coerce').fillna(0.0)
     df["Consumption"] = pd.to_numeric(df["Consumption"], errors='coerce').fillna(0.0)
     
-    for idx, row in df.iterrows():
-        # Calculate total received from day columns
-        total_received = 0.0
-        for col in day_cols:
-            if col in df.columns:
-                total_received += float(df.at[idx, col]) if pd.notna(df.at[idx, col]) else 0.0
-        
-        df.at[idx, "Total Received"] = total_received
-        
-        # Calculate closing stock: Opening + Received - Consumption
-        opening = float(df.at[idx, "Opening Stock"]) if pd.notna(df.at[idx, "Opening Stock"]) else 0.0
-        consumption = float(df.at[idx, "Consumption"]) if pd.notna(df.at[idx, "Consumption"]) else 0.0
-        df.at[idx, "Closing Stock"] = opening + total_received - consumption
-        
-        # Calculate variance
-        physical = df.at[idx, "Physical Count"]
-        if pd.notna(physical) and str(physical).strip() != "":
-            try:
-                physical_val = float(physical)
-                df.at[idx, "Variance"] = physical_val - df.at[idx, "Closing Stock"]
-            except:
-                df.at[idx, "Variance"] = 0.0
-        else:
-            df.at[idx, "Variance"] = 0.0
+    # Calculate closing stock: Opening + Received - Consumption
+    df["Closing Stock"] = df["Opening Stock"] + df["Total Received"] - df["Consumption"]
+    
+    # Variance only where a usable physical count was entered
+    physical = pd.to_numeric(df["Physical Count"], errors='coerce')
+    df["Variance"] = (physical - df["Closing Stock"]).fillna(0.0)
     
     return df
 
@@ -869,12 +871,11 @@ with tab_req:
                 
             if col2.button("🚀 Submit", type="primary", use_container_width=True, key="submit_req"):
                 try:
-                    all_reqs = load_from_sheet("restaurant_requisitions", ["ReqID", "Restaurant", "Item", "Qty", "Status", "DispatchQty", "AcceptedQty", "Timestamp", "RequestedDate", "FollowupSent"])
-                    
                     st.info(f"📤 Sending {len(st.session_state.cart)} items...")
                     
-                    for item in st.session_state.cart:
-                        new_req = pd.DataFrame([{
+                    _now = datetime.datetime.now()
+                    new_reqs = [
+                        {
                             "ReqID": str(uuid.uuid4())[:8],
                             "Restaurant": "Restaurant 01",
                             "Item": item['name'],
@@ -882,19 +883,19 @@ with tab_req:
                             "Status": "Pending",
                             "DispatchQty": 0.0,
                             "AcceptedQty": 0.0,
-                            "Timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "RequestedDate": datetime.datetime.now().strftime("%Y-%m-%d"),
+                            "Timestamp": _now.strftime("%Y-%m-%d %H:%M:%S"),
+                            "RequestedDate": _now.strftime("%Y-%m-%d"),
                             "FollowupSent": False
-                        }])
-                        all_reqs = pd.concat([all_reqs, new_req], ignore_index=True)
+                        }
+                        for item in st.session_state.cart
+                    ]
+                    # Upsert only the new rows (fresh ReqIDs, so this is an append); existing
+                    # requisitions are left exactly as the warehouse last wrote them
+                    new_reqs_df = pd.DataFrame(new_reqs)
                     
-                    st.write(f"✅ Total records to save: {len(all_reqs)}")
+                    st.write(f"✅ Total records to save: {len(new_reqs_df)}")
                     
-                    all_reqs["Qty"] = pd.to_numeric(all_reqs["Qty"], errors='coerce')
-                    all_reqs["DispatchQty"] = pd.to_numeric(all_reqs["DispatchQty"], errors='coerce')
-                    all_reqs = all_reqs.reset_index(drop=True)
-                    
-                    if save_to_sheet(all_reqs, "restaurant_requisitions"):
+                    if save_to_sheet(new_reqs_df, "restaurant_requisitions"):
                         st.success("✅ Requisition sent to Warehouse successfully!")
                         st.balloons()
                         st.session_state.cart = []
@@ -1202,37 +1203,30 @@ with tab_history:
                     date_hist = filtered_history[filtered_history["RequestedDate"] == req_date]
                     
                     with st.expander(f"📅 {date_str} ({len(date_hist)} items)", expanded=False):
-                        for hist_idx, (_, row) in enumerate(date_hist.iterrows()):
-                            item_name = row["Item"]
-                            req_qty = float(row["Qty"])
-                            dispatch_qty = float(row["DispatchQty"])
-                            status = row["Status"]
-                            timestamp = row.get("Timestamp", "N/A")
-                            remaining = req_qty - dispatch_qty
-                            followup = row.get("FollowupSent", False)
-                            
-                            # Color based on status
-                            if status == "Pending":
-                                status_color = "🟡"
-                                box_class = "status-pending"
-                            elif status == "Dispatched":
-                                status_color = "🟠"
-                                box_class = "status-dispatched"
-                            else:  # Completed
-                                status_color = "🟢"
-                                box_class = "status-completed"
-                            
-                            followup_text = "⚠️ Follow-up Sent" if followup else ""
-                            
-                            st.markdown(f"""
+                        # One markdown element per date instead of one per row
+                        _status = date_hist["Status"]
+                        _conds = [_status == "Pending", _status == "Dispatched"]
+                        _icons = np.select(_conds, ["🟡", "🟠"], "🟢")
+                        _classes = np.select(_conds, ["status-pending", "status-dispatched"], "status-completed")
+                        _stamps = (date_hist["Timestamp"] if "Timestamp" in date_hist.columns
+                                   else pd.Series("N/A", index=date_hist.index))
+                        _fups = (date_hist["FollowupSent"].astype(bool) if "FollowupSent" in date_hist.columns
+                                 else pd.Series(False, index=date_hist.index))
+                        _rows = zip(
+                            _classes, _icons, date_hist["Item"],
+                            date_hist["Qty"].astype(float), date_hist["DispatchQty"].astype(float),
+                            _status, _stamps, _fups,
+                        )
+                        st.markdown("".join(f"""
                             <div class="req-item {box_class}">
                                 <div class="req-item-content">
                                     <b>{status_color} {item_name}</b><br>
-                                    Req:{req_qty} | Got:{dispatch_qty} | Rem:{remaining}<br>
-                                    <small>Status: {status} | {timestamp} | {followup_text}</small>
+                                    Req:{req_qty} | Got:{dispatch_qty} | Rem:{req_qty - dispatch_qty}<br>
+                                    <small>Status: {status} | {timestamp} | {'⚠️ Follow-up Sent' if followup else ''}</small>
                                 </div>
                             </div>
-                            """, unsafe_allow_html=True)
+                            """ for box_class, status_color, item_name, req_qty, dispatch_qty, status, timestamp, followup in _rows
+                        ), unsafe_allow_html=True)
             else:
                 st.info("📭 No records match your filters")
         else:
@@ -1554,10 +1548,7 @@ with st.sidebar:
     
     if inv_file:
         try:
-            if inv_file.name.endswith('.xlsx'):
-                raw_df = pd.read_excel(inv_file, skiprows=4, header=None)
-            else:
-                raw_df = pd.read_csv(inv_file, skiprows=4, header=None)
+            raw_df = _read_upload(inv_file, skiprows=4, header=None)
 
             # Create standard format
             standard_df = create_standard_inventory(raw_df)
@@ -0,0 +1,37 @@
+import ast
+import io
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURE = ROOT / "tests" / "fixtures" / "legacy_inventory.csv"
+
+
+def _load_parse_upload():
+    # app.py is a Streamlit script, so importing it would run the whole UI.
+    # Pull just _parse_upload out of the module and drop its cache decorator.
+    tree = ast.parse((ROOT / "app.py").read_text(encoding="utf-8"))
+    func = next(
+        node for node in tree.body
+        if isinstance(node, ast.FunctionDef) and node.name == "_parse_upload"
+    )
+    func.decorator_list = []
+    module = ast.fix_missing_locations(ast.Module(body=[func], type_ignores=[]))
+    namespace = {"io": io, "pd": pd}
+    exec(compile(module, str(ROOT / "app.py"), "exec"), namespace)
+    return namespace["_parse_upload"]
+
+
+def test_legacy_csv_upload_is_read_positionally():
+    parse_upload = _load_parse_upload()
+
+    # Same arguments as the legacy "Inventory Master Sync" uploaders.
+    raw = parse_upload(FIXTURE.read_bytes(), False, skiprows=4, header=None, usecols=[1, 2, 3])
+
+    assert raw.shape == (3, 3)
+    assert raw.iloc[:, 0].tolist() == ["Rice", "Olive Oil", "Eggs"]
+    assert raw.iloc[:, 1].tolist() == ["kg", "ltr", "pcs"]
+    assert raw.iloc[:, 2].astype(float).tolist() == [25.0, 4.5, 120.0]